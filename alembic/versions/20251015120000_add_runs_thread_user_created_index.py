@@ -0,0 +1,39 @@
+"""Add composite index for listing runs by thread and user
+
+Revision ID: 3c1f0a9d4e2b
+Revises: aee821a02fc8
+Create Date: 2025-10-15 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c1f0a9d4e2b"
+down_revision = "aee821a02fc8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_runs_thread_user_created",
+            "runs",
+            ["thread_id", "user_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_runs_thread_user_created",
+            table_name="runs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -6,10 +6,24 @@ This module provides environment-based authentication switching between:
 - custom: Custom authentication integration
 
 Set AUTH_TYPE environment variable to choose authentication mode.
+
+The custom mode accepts AUTH_DEV_TOKEN as a development bearer token. The
+shortcut is off unless the variable is set.
+
+Successfully verified bearer tokens are cached for a short time so repeated
+requests with the same token skip validation. Tune with AUTH_CACHE_TTL
+(seconds, 0 disables) and AUTH_CACHE_MAX (maximum cached tokens).
 """
 
+import functools
+import hashlib
+import hmac
 import logging
 import os
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 
 from langgraph_sdk import Auth
@@ -22,116 +36,335 @@ auth = Auth()
 # Get authentication type from environment
 AUTH_TYPE = os.getenv("AUTH_TYPE", "noop").lower()
 
-if AUTH_TYPE == "noop":
-    logger.info("Using noop authentication (no auth required)")
-
-    @auth.authenticate
-    async def authenticate(headers: dict[str, str]) -> Auth.types.MinimalUserDict:
-        """No-op authentication that allows all requests."""
-        _ = headers  # Suppress unused warning
-        return {
-            "identity": "anonymous",
-            "display_name": "Anonymous User",
-            "is_authenticated": True,
-        }
-
-    @auth.on
-    async def authorize(
-        ctx: Auth.types.AuthContext, value: dict[str, Any]
-    ) -> dict[str, Any]:
-        """No-op authorization that allows access to all resources."""
-        _ = ctx, value  # Suppress unused warnings
-        return {}  # Empty filter = no access restrictions
-
-elif AUTH_TYPE == "custom":
-    logger.info("Using custom authentication")
-
-    @auth.authenticate
-    async def authenticate(headers: dict[str, str]) -> Auth.types.MinimalUserDict:
-        """
-        Custom authentication handler.
+# Development bearer token for the custom mode (unset or empty disables it)
+AUTH_DEV_TOKEN = os.getenv("AUTH_DEV_TOKEN", "")
+if not AUTH_DEV_TOKEN.isascii():
+    raise ValueError("AUTH_DEV_TOKEN must contain only ASCII characters")
 
-        Modify this function to integrate with your authentication service.
-        """
-        # Extract authorization header
-        authorization = (
-            headers.get("authorization")
-            or headers.get("Authorization")
-            or headers.get(b"authorization")
-            or headers.get(b"Authorization")
+# Verified token cache settings
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "5"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "10000"))
+
+
+class TokenCache:
+    """Bounded LRU cache of verified tokens with per-entry expiry.
+
+    Entries are keyed by a digest of the token so raw credentials are never
+    kept in memory. Only successful validations should be stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, Auth.types.MinimalUserDict]] = (
+            OrderedDict()
         )
 
-        # Handle bytes headers
-        if isinstance(authorization, bytes):
-            authorization = authorization.decode("utf-8")
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
 
-        if not authorization:
-            logger.warning("Missing Authorization header")
-            raise Auth.exceptions.HTTPException(
-                status_code=401, detail="Authorization header required"
-            )
+    def get(self, token: str) -> Auth.types.MinimalUserDict | None:
+        """Return the cached user for a token, or None if missing or expired."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user
+
+    def set(
+        self,
+        token: str,
+        user: Auth.types.MinimalUserDict,
+        exp: float | None = None,
+    ) -> None:
+        """Cache a verified user until ``min(exp, now + ttl)``.
+
+        Args:
+            token: Raw bearer token
+            user: User resolved from the token
+            exp: Optional token expiry as a unix timestamp
+        """
+        ttl = self.ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_token_cache = TokenCache(maxsize=AUTH_CACHE_MAX, ttl=AUTH_CACHE_TTL)
+
+
+class RejectionLog:
+    """Aggregate a repetitive rejection warning into one record per interval.
+
+    Each occurrence is only counted (and logged at DEBUG when enabled), so a
+    flood of bad requests costs a counter increment rather than a log write.
+    The reported count covers every occurrence since the previous warning,
+    which may span more than one interval.
+    """
+
+    def __init__(self, message: str, interval: float = 60.0) -> None:
+        self.message = message
+        self.interval = interval
+        self._count = 0
+        self._next_emit = 0.0
+
+    def hit(self) -> None:
+        self._count += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(self.message)
+
+        now = time.monotonic()
+        if now < self._next_emit:
+            return
+        logger.warning("%s (%d since the previous report)", self.message, self._count)
+        self._count = 0
+        self._next_emit = now + self.interval
+
+
+_missing_header_log = RejectionLog("Missing Authorization header")
+_invalid_token_log = RejectionLog("Invalid token")
+
+# Authorization errors include a traceback at most once per interval
+AUTHZ_TRACEBACK_INTERVAL = 60.0
+_next_authz_traceback = 0.0
+
+
+def _log_authorization_error(error: Exception) -> None:
+    """Log an authorization failure, sampling the expensive traceback."""
+    global _next_authz_traceback
+    now = time.monotonic()
+    with_traceback = now >= _next_authz_traceback
+    if with_traceback:
+        _next_authz_traceback = now + AUTHZ_TRACEBACK_INTERVAL
+    logger.error("Authorization error: %s", error, exc_info=with_traceback)
+
+
+# Constant users, built once at import and shared read-only across requests
+ANONYMOUS_USER: Mapping[str, Any] = MappingProxyType(
+    {
+        "identity": "anonymous",
+        "display_name": "Anonymous User",
+        "is_authenticated": True,
+    }
+)
+DEV_USER: Mapping[str, Any] = MappingProxyType(
+    {
+        "identity": "dev-user",
+        "display_name": "Development User",
+        "email": "dev@example.com",
+        "permissions": ("admin",),
+        "org_id": "dev-org",
+        "is_authenticated": True,
+    }
+)
+
+# Details for the common 401 rejections. A fresh exception is raised per
+# request so no traceback or context from an earlier request is retained.
+MISSING_AUTH_DETAIL = "Authorization header required"
+INVALID_FORMAT_DETAIL = "Invalid authorization format. Expected 'Bearer <token>'"
+INVALID_TOKEN_DETAIL = "Invalid authentication token"
+
+# Characters allowed in a bearer token: visible ASCII (RFC 7235)
+TOKEN_CHARS = bytes(range(0x21, 0x7F))
+
+# Actions that never carry a payload worth stamping with owner metadata
+READ_ACTIONS = frozenset({"read", "search", "get", "list_namespaces"})
+
+
+@functools.lru_cache(maxsize=4096)
+def _owner_filter(user_id: str) -> Mapping[str, Any]:
+    """Return the shared, read-only owner filter for a user."""
+    return MappingProxyType({"owner": user_id})
 
-        # Development token for testing
-        if authorization == "Bearer dev-token":
-            return {
-                "identity": "dev-user",
-                "display_name": "Development User",
-                "email": "dev@example.com",
-                "permissions": ["admin"],
-                "org_id": "dev-org",
-                "is_authenticated": True,
-            }
-
-        # Example: Simple API key validation (replace with your logic)
-        if authorization.startswith("Bearer "):
-            # TODO: Replace with your auth service integration
-            logger.warning("Invalid token")
-            raise Auth.exceptions.HTTPException(
-                status_code=401, detail="Invalid authentication token"
-            )
 
-        # Reject requests without proper format
+# ---------------------------------------------------------------------------
+# noop
+# ---------------------------------------------------------------------------
+
+
+def noop_authenticate(headers: dict[str, str]) -> Mapping[str, Any]:
+    """No-op authentication that allows all requests.
+
+    Plain function on purpose: the auth middleware awaits only awaitable
+    results, so this skips a coroutine allocation per request.
+    """
+    _ = headers  # Suppress unused warning
+    return ANONYMOUS_USER
+
+
+async def noop_authorize(
+    ctx: Auth.types.AuthContext, value: dict[str, Any]
+) -> dict[str, Any]:
+    """No-op authorization that allows access to all resources."""
+    _ = ctx, value  # Suppress unused warnings
+    return {}  # Empty filter = no access restrictions
+
+
+# ---------------------------------------------------------------------------
+# custom
+# ---------------------------------------------------------------------------
+
+
+async def verify_token(token: str) -> Auth.types.MinimalUserDict:
+    """
+    Validate a bearer token and resolve the user it belongs to.
+
+    Replace this with your auth service integration. Include an ``exp``
+    (unix timestamp) in the returned dict to bound how long it is cached.
+    """
+    _ = token
+    # TODO: Replace with your auth service integration
+    _invalid_token_log.hit()
+    raise Auth.exceptions.HTTPException(
+        status_code=401, detail=INVALID_TOKEN_DETAIL
+    ) from None
+
+
+async def custom_authenticate(
+    headers: dict[str, str],
+) -> Auth.types.MinimalUserDict | Mapping[str, Any]:
+    """
+    Custom authentication handler.
+
+    Modify this function to integrate with your authentication service.
+    """
+    # Extract authorization header. Header names arrive lowercased (ASGI
+    # spec), so only the str and raw bytes forms need probing.
+    authorization = headers.get("authorization") or headers.get(b"authorization")
+
+    # Handle bytes headers. Header values are ASCII (RFC 7230), so a
+    # latin-1 decode is a plain copy and the isascii() check below rejects
+    # anything else without running a UTF-8 validator.
+    if isinstance(authorization, bytes):
+        authorization = authorization.decode("latin-1")
+
+    if not authorization:
+        _missing_header_log.hit()
         raise Auth.exceptions.HTTPException(
-            status_code=401,
-            detail="Invalid authorization format. Expected 'Bearer <token>'",
+            status_code=401, detail=MISSING_AUTH_DETAIL
+        ) from None
+
+    # Split "<scheme> <token>" in a single pass, then validate the token
+    # charset in one C-level sweep: deleting every visible-ASCII byte
+    # leaves nothing behind for a well-formed token.
+    scheme, _, token = authorization.partition(" ")
+    if (
+        scheme != "Bearer"
+        or not token
+        or not token.isascii()
+        or token.encode("ascii").translate(None, TOKEN_CHARS)
+    ):
+        raise Auth.exceptions.HTTPException(
+            status_code=401, detail=INVALID_FORMAT_DETAIL
+        ) from None
+
+    # Development token for testing (constant-time compare)
+    if AUTH_DEV_TOKEN and hmac.compare_digest(token, AUTH_DEV_TOKEN):
+        return DEV_USER
+
+    user = _token_cache.get(token)
+    if user is None:
+        # Failed validations raise and are never cached
+        user = await verify_token(token)
+        _token_cache.set(token, user, exp=user.get("exp"))
+    return user
+
+
+def _require_identity(ctx: Auth.types.AuthContext) -> str:
+    """Return the authenticated user's identity or raise an HTTPException."""
+    try:
+        user_id = ctx.user.identity
+    except AttributeError as e:
+        _log_authorization_error(e)
+        raise Auth.exceptions.HTTPException(
+            status_code=500, detail="Authorization system error"
+        ) from e
+
+    if not user_id:
+        logger.error("Missing user identity in auth context")
+        raise Auth.exceptions.HTTPException(
+            status_code=401, detail="Invalid user identity"
         )
+    return user_id
 
-    @auth.on
-    async def authorize(
-        ctx: Auth.types.AuthContext, value: dict[str, Any]
-    ) -> dict[str, Any]:
-        """
-        Multi-tenant authorization with user-scoped access control.
-        """
-        try:
-            # Get user identity from authentication context
-            user_id = ctx.user.identity
-
-            if not user_id:
-                logger.error("Missing user identity in auth context")
-                raise Auth.exceptions.HTTPException(
-                    status_code=401, detail="Invalid user identity"
-                )
-
-            # Create owner filter for resource access control
-            owner_filter = {"owner": user_id}
-
-            # Add owner information to metadata for create/update operations
-            metadata = value.setdefault("metadata", {})
-            metadata.update(owner_filter)
-
-            # Return filter for database operations
-            return owner_filter
-
-        except Auth.exceptions.HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Authorization error: {e}", exc_info=True)
+
+async def custom_authorize(
+    ctx: Auth.types.AuthContext, value: dict[str, Any]
+) -> Mapping[str, Any]:
+    """
+    Multi-tenant authorization with user-scoped access control.
+    """
+    user_id = _require_identity(ctx)
+
+    # Add owner information to metadata for create/update operations
+    if value and ctx.action not in READ_ACTIONS:
+        metadata = value.get("metadata")
+        if metadata is None:
+            value["metadata"] = {"owner": user_id}
+        elif isinstance(metadata, dict):
+            metadata["owner"] = user_id
+        else:
             raise Auth.exceptions.HTTPException(
-                status_code=500, detail="Authorization system error"
-            ) from e
+                status_code=400, detail="Metadata must be an object"
+            )
+
+    # Return filter for database operations
+    return _owner_filter(user_id)
+
+
+async def custom_authorize_read(
+    ctx: Auth.types.AuthContext, value: dict[str, Any]
+) -> Mapping[str, Any]:
+    """Read-only authorization: return the owner filter, never touch value."""
+    _ = value  # Suppress unused warning
+    return _owner_filter(_require_identity(ctx))
+
 
-else:
+# Handler pairs per AUTH_TYPE, selected once at import
+HANDLERS = {
+    "noop": (noop_authenticate, noop_authorize),
+    "custom": (custom_authenticate, custom_authorize),
+}
+
+try:
+    authenticate, authorize = HANDLERS[AUTH_TYPE]
+except KeyError:
     raise ValueError(
         f"Unknown AUTH_TYPE: {AUTH_TYPE}. Supported values: 'noop', 'custom'"
-    )
+    ) from None
+
+logger.info(f"Using {AUTH_TYPE} authentication")
+auth.authenticate(authenticate)
+auth.on(authorize)
+
+# Specialized read handlers per AUTH_TYPE. LangGraph prefers the most
+# specific (resource, action) handler, so read traffic skips the generic
+# handler and its payload checks entirely.
+READ_HANDLERS = {"custom": custom_authorize_read}
+READ_ROUTES = {
+    "assistants": ("read", "search"),
+    "threads": ("read", "search"),
+    "crons": ("read", "search"),
+    "store": ("get", "search", "list_namespaces"),
+}
+
+authorize_read = READ_HANDLERS.get(AUTH_TYPE)
+if authorize_read is not None:
+    for resource, actions in READ_ROUTES.items():
+        auth.on(resources=resource, actions=list(actions))(authorize_read)
@@ -2,8 +2,10 @@
 
 import asyncio
 import contextlib
+import functools
+import json
 import logging
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Coroutine, Mapping
 from datetime import UTC, datetime
 from typing import Any
 from uuid import uuid4
@@ -11,7 +13,8 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from langgraph.types import Command, Send
-from sqlalchemy import delete, select, update
+from sqlalchemy import cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.auth_ctx import with_auth_ctx
@@ -22,8 +25,11 @@ from ..core.orm import Thread as ThreadORM
 from ..core.orm import _get_session_maker, get_session
 from ..core.serializers import GeneralSerializer
 from ..core.sse import create_end_event, get_sse_headers
-from ..models import Run, RunCreate, RunStatus, User
+from ..models import CommandIn, Run, RunCreate, RunStatus, User
+from ..services.admission import run_admission
+from ..services.broker import broker_manager
 from ..services.langgraph_service import create_run_config, get_langgraph_service
+from ..services.run_status_batcher import run_status_batcher
 from ..services.streaming_service import streaming_service
 from ..utils.assistants import resolve_assistant_id
 
@@ -38,70 +44,247 @@ serializer = GeneralSerializer()
 # All run metadata/state is persisted via ORM.
 active_runs: dict[str, asyncio.Task] = {}
 
+# Seconds join_run waits for a run to finish before returning its current output
+JOIN_TIMEOUT = 30.0
+
+# Seconds cancel/delete wait for a cancelled run's task to settle
+CANCEL_TIMEOUT = 5.0
+
+# Run table columns, resolved once; list_runs selects these as plain rows
+_RUN_COLUMNS = tuple(RunORM.__table__.columns)
+
 # Default stream modes for background run execution
 DEFAULT_STREAM_MODES = ["values"]
 
+# Replay events are written to the event store in batches: a batch is flushed
+# once it holds this many events or has been pending for this many seconds.
+# Live consumers are fed through the in-memory broker without delay.
+EVENT_STORE_BATCH_SIZE = 16
+EVENT_STORE_FLUSH_INTERVAL = 0.01
+
+
+def _discard_run(run_id: str, task: asyncio.Task) -> None:
+    """Done-callback that releases a finished run's task and broker.
+
+    Runs even when the task is cancelled before its first step, so entries
+    never outlive the task. The broker is only marked finished; the broker
+    manager's sweeper drops it once late consumers have drained it.
+    """
+    if active_runs.get(run_id) is task:
+        del active_runs[run_id]
+    broker_manager.cleanup_broker(run_id)
 
-def map_command_to_langgraph(cmd: dict[str, Any]) -> Command:
-    """Convert API command to LangGraph Command"""
-    goto = cmd.get("goto")
-    if goto is not None and not isinstance(goto, list):
-        goto = [goto]
 
-    update = cmd.get("update")
-    if isinstance(update, (tuple, list)) and all(
-        isinstance(t, (tuple, list)) and len(t) == 2 and isinstance(t[0], str)
-        for t in update
-    ):
-        update = [tuple(t) for t in update]
+def register_run(run_id: str, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+    """Start a run's background task and track it in ``active_runs``.
 
+    The registry holds the only strong reference to the task; the
+    done-callback removes it again however the task ends.
+    """
+    task = asyncio.create_task(coro, name=f"run-{run_id}")
+    active_runs[run_id] = task
+    task.add_done_callback(functools.partial(_discard_run, run_id))
+    return task
+
+
+def map_command_to_langgraph(cmd: CommandIn) -> Command:
+    """Convert API command to LangGraph Command"""
     return Command(
-        update=update,
+        update=cmd.update,
         goto=(
-            [
-                it if isinstance(it, str) else Send(it["node"], it["input"])
-                for it in goto
-            ]
-            if goto
+            [it if isinstance(it, str) else Send(it.node, it.input) for it in cmd.goto]
+            if cmd.goto
             else None
         ),
-        resume=cmd.get("resume"),
+        resume=cmd.resume,
     )
 
 
-async def set_thread_status(session: AsyncSession, thread_id: str, status: str) -> None:
-    """Update the status column of a thread."""
+async def set_thread_status(
+    session: AsyncSession,
+    thread_id: str,
+    status: str,
+    now: datetime | None = None,
+) -> None:
+    """Update the status column of a thread; the caller commits.
+
+    ``updated_at`` defaults to the database's ``now()``, like run status
+    writes, so run and thread timestamps come from the same clock.
+    """
     await session.execute(
         update(ThreadORM)
         .where(ThreadORM.thread_id == thread_id)
-        .values(status=status, updated_at=datetime.now(UTC))
+        .values(status=status, updated_at=now or func.now())
     )
+
+
+async def finalize_run_status(
+    session: AsyncSession,
+    run_id: str,
+    thread_id: str,
+    status: str,
+    thread_status: str = "idle",
+    output: Any = None,
+    error: str | None = None,
+) -> None:
+    """Write a run's final status and its thread's status in one commit."""
+    await update_run_status(run_id, status, output, error, session=session)
+    await set_thread_status(session, thread_id, thread_status)
     await session.commit()
 
 
-async def update_thread_metadata(
-    session: AsyncSession, thread_id: str, assistant_id: str, graph_id: str
+async def _write_final_status(
+    session: AsyncSession | None,
+    run_id: str,
+    thread_id: str,
+    status: str,
+    **kwargs: Any,
 ) -> None:
-    """Update thread metadata with assistant and graph information (dialect agnostic)."""
-    # Read-modify-write to avoid DB-specific JSON concat operators
-    thread = await session.scalar(
-        select(ThreadORM).where(ThreadORM.thread_id == thread_id)
-    )
-    if not thread:
-        raise HTTPException(404, f"Thread '{thread_id}' not found for metadata update")
-    md = dict(getattr(thread, "metadata_json", {}) or {})
-    md.update(
-        {
-            "assistant_id": str(assistant_id),
-            "graph_id": graph_id,
-        }
+    """Run :func:`finalize_run_status`, in a short-lived session unless given one.
+
+    The session is closed as soon as the write finishes or fails, so its
+    pooled connection is never left checked out.
+    """
+    if session is not None:
+        await finalize_run_status(session, run_id, thread_id, status, **kwargs)
+        return
+    async with _get_session_maker()() as own_session:
+        await finalize_run_status(own_session, run_id, thread_id, status, **kwargs)
+
+
+async def _finish_shielded(coro: Coroutine[Any, Any, None]) -> None:
+    """Run ``coro`` to completion even if the caller is cancelled meanwhile.
+
+    The caller stays alive until the write settles, so shutdown's bounded wait
+    on run tasks also covers it; a cancellation received in the meantime is
+    re-raised once it has.
+    """
+    write = asyncio.ensure_future(coro)
+    cancelled = False
+    while True:
+        try:
+            await asyncio.shield(write)
+            break
+        except asyncio.CancelledError:
+            if write.done():
+                raise
+            cancelled = True
+    if cancelled:
+        raise asyncio.CancelledError
+
+
+async def persist_run_status(
+    session: AsyncSession, run_id: str, thread_id: str, user_id: str, status: str
+) -> RunORM | None:
+    """Write a run's new status and return the updated row.
+
+    The UPDATE is scoped to the owning thread and user and returns the row
+    itself, so no lookup is needed before or after it. Returns None when no
+    matching run exists.
+    """
+    updated = await session.scalar(
+        update(RunORM)
+        .where(
+            RunORM.run_id == run_id,
+            RunORM.thread_id == thread_id,
+            RunORM.user_id == user_id,
+        )
+        .values(status=status, updated_at=func.now())
+        .returning(RunORM)
+        .execution_options(populate_existing=True)
     )
-    await session.execute(
+    await session.commit()
+    return updated
+
+
+def _json_merge(session: AsyncSession, column: Any, patch: dict[str, Any]) -> Any:
+    """Build a SQL expression that shallow-merges ``patch`` into a JSON column.
+
+    PostgreSQL uses the JSONB ``||`` operator; other dialects (SQLite in local
+    tooling) fall back to ``json_patch``. The merge runs inside the UPDATE so
+    no read round-trip is needed.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return func.coalesce(column, cast({}, JSONB)).op("||")(cast(patch, JSONB))
+    return func.json_patch(func.coalesce(column, "{}"), json.dumps(patch))
+
+
+async def mark_thread_busy(
+    session: AsyncSession,
+    thread_id: str,
+    assistant_id: str,
+    graph_id: str,
+    now: datetime | None = None,
+) -> None:
+    """Mark a thread busy and merge assistant/graph info into its metadata.
+
+    Issues a single UPDATE and leaves committing to the caller so it shares a
+    transaction with the run insert. Pass ``now`` to stamp the thread with the
+    same time as the run being created.
+    """
+    patch = {"assistant_id": str(assistant_id), "graph_id": graph_id}
+    updated = await session.scalar(
         update(ThreadORM)
         .where(ThreadORM.thread_id == thread_id)
-        .values(metadata_json=md, updated_at=datetime.now(UTC))
+        .values(
+            status="busy",
+            metadata_json=_json_merge(session, ThreadORM.metadata_json, patch),
+            updated_at=now or datetime.now(UTC),
+        )
+        .returning(ThreadORM.thread_id)
+    )
+    if updated is None:
+        raise HTTPException(404, f"Thread '{thread_id}' not found for metadata update")
+
+
+async def load_run_assistant(
+    session: AsyncSession,
+    thread_id: str,
+    request: RunCreate,
+    available_graphs: Mapping[str, str],
+) -> AssistantORM:
+    """Fetch the run's assistant and, for resume commands, validate the thread.
+
+    Resumes need the thread status too; the assistant is outer-joined onto
+    the thread row so both checks cost one round-trip. Thread errors still
+    take precedence over a missing assistant.
+    """
+    resolved_assistant_id = resolve_assistant_id(
+        str(request.assistant_id), available_graphs
     )
-    await session.commit()
+
+    if request.command and request.command.resume is not None:
+        result = await session.execute(
+            select(AssistantORM, ThreadORM.status)
+            .select_from(ThreadORM)
+            .outerjoin(AssistantORM, AssistantORM.assistant_id == resolved_assistant_id)
+            .where(ThreadORM.thread_id == thread_id)
+        )
+        row = result.first()
+        if row is None:
+            raise HTTPException(404, f"Thread '{thread_id}' not found")
+        assistant, status = row
+        if status != "interrupted":
+            raise HTTPException(
+                400, "Cannot resume: thread is not in interrupted state"
+            )
+        if not assistant:
+            raise HTTPException(404, f"Assistant '{request.assistant_id}' not found")
+    else:
+        assistant = await session.scalar(
+            select(AssistantORM).where(
+                AssistantORM.assistant_id == resolved_assistant_id
+            )
+        )
+        if not assistant:
+            raise HTTPException(404, f"Assistant '{request.assistant_id}' not found")
+
+    # Validate the assistant's graph exists
+    if assistant.graph_id not in available_graphs:
+        raise HTTPException(
+            404, f"Graph '{assistant.graph_id}' not found for assistant"
+        )
+    return assistant
 
 
 @router.post("/threads/{thread_id}/runs", response_model=Run)
@@ -113,61 +296,36 @@ async def create_run(
 ) -> Run:
     """Create and execute a new run (persisted)."""
 
-    # Validate resume command requirements early
-    if request.command and request.command.get("resume") is not None:
-        # Check if thread exists and is in interrupted state
-        thread_stmt = select(ThreadORM).where(ThreadORM.thread_id == thread_id)
-        thread = await session.scalar(thread_stmt)
-        if not thread:
-            raise HTTPException(404, f"Thread '{thread_id}' not found")
-        if thread.status != "interrupted":
-            raise HTTPException(
-                400, "Cannot resume: thread is not in interrupted state"
-            )
-
     run_id = str(uuid4())
+    now = datetime.now(UTC)
 
     # Get LangGraph service
     langgraph_service = get_langgraph_service()
-    print(
-        f"create_run: scheduling background task run_id={run_id} thread_id={thread_id} user={user.identity}"
-    )
-    print(
-        f"[create_run] scheduling background task run_id={run_id} thread_id={thread_id} user={user.identity}"
+    logger.debug(
+        "[create_run] scheduling background task run_id=%s thread_id=%s user=%s",
+        run_id,
+        thread_id,
+        user.identity,
     )
 
     # Validate assistant exists and get its graph_id. If a graph_id was provided
     # instead of an assistant UUID, map it deterministically and fall back to the
     # default assistant created at startup.
-    requested_id = str(request.assistant_id)
-    available_graphs = langgraph_service.list_graphs()
-    resolved_assistant_id = resolve_assistant_id(requested_id, available_graphs)
+    assistant = await load_run_assistant(
+        session, thread_id, request, langgraph_service.list_graphs()
+    )
+    resolved_assistant_id = assistant.assistant_id
 
     config = request.config
     context = request.context
 
-    assistant_stmt = select(AssistantORM).where(
-        AssistantORM.assistant_id == resolved_assistant_id,
-    )
-    assistant = await session.scalar(assistant_stmt)
-    if not assistant:
-        raise HTTPException(404, f"Assistant '{request.assistant_id}' not found")
-
-    # Validate the assistant's graph exists
-    available_graphs = langgraph_service.list_graphs()
-    if assistant.graph_id not in available_graphs:
-        raise HTTPException(
-            404, f"Graph '{assistant.graph_id}' not found for assistant"
-        )
-
-    # Mark thread as busy and update metadata with assistant/graph info
-    await set_thread_status(session, thread_id, "busy")
-    await update_thread_metadata(
-        session, thread_id, assistant.assistant_id, assistant.graph_id
+    # Mark thread as busy and update metadata with assistant/graph info; this
+    # and the run insert below commit together
+    await mark_thread_busy(
+        session, thread_id, assistant.assistant_id, assistant.graph_id, now=now
     )
 
     # Persist run record via ORM model in core.orm (Run table)
-    now = datetime.now(UTC)
     run_orm = RunORM(
         run_id=run_id,  # explicitly set (DB can also default-generate if omitted)
         thread_id=thread_id,
@@ -185,8 +343,9 @@ async def create_run(
     session.add(run_orm)
     await session.commit()
 
-    # Build response from ORM -> Pydantic
-    run = Run(
+    # Build response from the values just persisted; they are known-valid, so
+    # skip re-validation
+    run = Run.model_construct(
         run_id=run_id,
         thread_id=thread_id,
         assistant_id=resolved_assistant_id,
@@ -203,7 +362,8 @@ async def create_run(
 
     # Start execution asynchronously
     # Don't pass the session to avoid transaction conflicts
-    task = asyncio.create_task(
+    task = register_run(
+        run_id,
         execute_run_async(
             run_id,
             thread_id,
@@ -220,12 +380,13 @@ async def create_run(
             request.interrupt_after,
             request.multitask_strategy,
             request.stream_subgraphs,
-        )
+        ),
     )
-    print(
-        f"[create_run] background task created task_id={id(task)} for run_id={run_id}"
+    logger.debug(
+        "[create_run] background task created task_id=%s for run_id=%s",
+        id(task),
+        run_id,
     )
-    active_runs[run_id] = task
 
     return run
 
@@ -239,58 +400,35 @@ async def create_and_stream_run(
 ) -> StreamingResponse:
     """Create a new run and stream its execution - persisted + SSE."""
 
-    # Validate resume command requirements early
-    if request.command and request.command.get("resume") is not None:
-        # Check if thread exists and is in interrupted state
-        thread_stmt = select(ThreadORM).where(ThreadORM.thread_id == thread_id)
-        thread = await session.scalar(thread_stmt)
-        if not thread:
-            raise HTTPException(404, f"Thread '{thread_id}' not found")
-        if thread.status != "interrupted":
-            raise HTTPException(
-                400, "Cannot resume: thread is not in interrupted state"
-            )
-
     run_id = str(uuid4())
+    now = datetime.now(UTC)
 
     # Get LangGraph service
     langgraph_service = get_langgraph_service()
-    print(
-        f"[create_and_stream_run] scheduling background task run_id={run_id} thread_id={thread_id} user={user.identity}"
+    logger.debug(
+        "[create_and_stream_run] scheduling background task run_id=%s thread_id=%s user=%s",
+        run_id,
+        thread_id,
+        user.identity,
     )
 
     # Validate assistant exists and get its graph_id. Allow passing a graph_id
     # by mapping it to a deterministic assistant ID.
-    requested_id = str(request.assistant_id)
-    available_graphs = langgraph_service.list_graphs()
-
-    resolved_assistant_id = resolve_assistant_id(requested_id, available_graphs)
+    assistant = await load_run_assistant(
+        session, thread_id, request, langgraph_service.list_graphs()
+    )
+    resolved_assistant_id = assistant.assistant_id
 
     config = request.config
     context = request.context
 
-    assistant_stmt = select(AssistantORM).where(
-        AssistantORM.assistant_id == resolved_assistant_id,
-    )
-    assistant = await session.scalar(assistant_stmt)
-    if not assistant:
-        raise HTTPException(404, f"Assistant '{request.assistant_id}' not found")
-
-    # Validate the assistant's graph exists
-    available_graphs = langgraph_service.list_graphs()
-    if assistant.graph_id not in available_graphs:
-        raise HTTPException(
-            404, f"Graph '{assistant.graph_id}' not found for assistant"
-        )
-
-    # Mark thread as busy and update metadata with assistant/graph info
-    await set_thread_status(session, thread_id, "busy")
-    await update_thread_metadata(
-        session, thread_id, assistant.assistant_id, assistant.graph_id
+    # Mark thread as busy and update metadata with assistant/graph info; this
+    # and the run insert below commit together
+    await mark_thread_busy(
+        session, thread_id, assistant.assistant_id, assistant.graph_id, now=now
     )
 
     # Persist run record
-    now = datetime.now(UTC)
     run_orm = RunORM(
         run_id=run_id,
         thread_id=thread_id,
@@ -308,8 +446,8 @@ async def create_and_stream_run(
     session.add(run_orm)
     await session.commit()
 
-    # Build response model for stream context
-    run = Run(
+    # Build response model for stream context (values already validated)
+    run = Run.model_construct(
         run_id=run_id,
         thread_id=thread_id,
         assistant_id=resolved_assistant_id,
@@ -326,7 +464,8 @@ async def create_and_stream_run(
 
     # Start background execution that will populate the broker
     # Don't pass the session to avoid transaction conflicts
-    task = asyncio.create_task(
+    task = register_run(
+        run_id,
         execute_run_async(
             run_id,
             thread_id,
@@ -343,12 +482,13 @@ async def create_and_stream_run(
             request.interrupt_after,
             request.multitask_strategy,
             request.stream_subgraphs,
-        )
+        ),
     )
-    print(
-        f"[create_and_stream_run] background task created task_id={id(task)} for run_id={run_id}"
+    logger.debug(
+        "[create_and_stream_run] background task created task_id=%s for run_id=%s",
+        id(task),
+        run_id,
     )
-    active_runs[run_id] = task
 
     # Extract requested stream mode(s)
     stream_mode = request.stream_mode
@@ -382,27 +522,29 @@ async def get_run(
 ) -> Run:
     """Get run by ID (persisted)."""
     stmt = select(RunORM).where(
-        RunORM.run_id == str(run_id),
+        RunORM.run_id == run_id,
         RunORM.thread_id == thread_id,
         RunORM.user_id == user.identity,
     )
-    print(
-        f"[get_run] querying DB run_id={run_id} thread_id={thread_id} user={user.identity}"
+    logger.debug(
+        "[get_run] querying DB run_id=%s thread_id=%s user=%s",
+        run_id,
+        thread_id,
+        user.identity,
     )
     run_orm = await session.scalar(stmt)
     if not run_orm:
         raise HTTPException(404, f"Run '{run_id}' not found")
 
-    # Refresh to ensure we have the latest data (in case background task updated it)
-    await session.refresh(run_orm)
-
-    print(
-        f"[get_run] found run status={run_orm.status} user={user.identity} thread_id={thread_id} run_id={run_id}"
+    logger.debug(
+        "[get_run] found run status=%s user=%s thread_id=%s run_id=%s",
+        run_orm.status,
+        user.identity,
+        thread_id,
+        run_id,
     )
     # Convert to Pydantic
-    return Run.model_validate(
-        {c.name: getattr(run_orm, c.name) for c in run_orm.__table__.columns}
-    )
+    return Run.model_validate(run_orm)
 
 
 @router.get("/threads/{thread_id}/runs", response_model=list[Run])
@@ -416,7 +558,7 @@ async def list_runs(
 ) -> list[Run]:
     """List runs for a specific thread (persisted)."""
     stmt = (
-        select(RunORM)
+        select(*_RUN_COLUMNS)
         .where(
             RunORM.thread_id == thread_id,
             RunORM.user_id == user.identity,
@@ -426,14 +568,16 @@ async def list_runs(
         .offset(offset)
         .order_by(RunORM.created_at.desc())
     )
-    print(f"[list_runs] querying DB thread_id={thread_id} user={user.identity}")
-    result = await session.scalars(stmt)
-    rows = result.all()
-    runs = [
-        Run.model_validate({c.name: getattr(r, c.name) for c in r.__table__.columns})
-        for r in rows
-    ]
-    print(f"[list_runs] total={len(runs)} user={user.identity} thread_id={thread_id}")
+    logger.debug(
+        "[list_runs] querying DB thread_id=%s user=%s", thread_id, user.identity
+    )
+    result = await session.execute(stmt)
+    # Plain column rows bypass the ORM identity map, and the schema already
+    # guarantees their shape, so the models are built without re-validation
+    runs = [Run.model_construct(**row._mapping) for row in result]
+    logger.debug(
+        "[list_runs] total=%s user=%s thread_id=%s", len(runs), user.identity, thread_id
+    )
     return runs
 
 
@@ -446,56 +590,48 @@ async def update_run(
     session: AsyncSession = Depends(get_session),
 ) -> Run:
     """Update run status (for cancellation/interruption, persisted)."""
-    print(
-        f"[update_run] fetch for update run_id={run_id} thread_id={thread_id} user={user.identity}"
-    )
-    run_orm = await session.scalar(
-        select(RunORM).where(
-            RunORM.run_id == str(run_id),
-            RunORM.thread_id == thread_id,
-            RunORM.user_id == user.identity,
+    if request.status not in ("cancelled", "interrupted"):
+        logger.debug(
+            "[update_run] fetch run_id=%s thread_id=%s user=%s",
+            run_id,
+            thread_id,
+            user.identity,
+        )
+        run_orm = await session.scalar(
+            select(RunORM).where(
+                RunORM.run_id == run_id,
+                RunORM.thread_id == thread_id,
+                RunORM.user_id == user.identity,
+            )
         )
+        if not run_orm:
+            raise HTTPException(404, f"Run '{run_id}' not found")
+        return Run.model_validate(run_orm)
+
+    # Handle interruption/cancellation
+    logger.debug(
+        "[update_run] set DB status=%s run_id=%s user=%s thread_id=%s",
+        request.status,
+        run_id,
+        user.identity,
+        thread_id,
+    )
+    run_orm = await persist_run_status(
+        session, run_id, thread_id, user.identity, request.status
     )
     if not run_orm:
         raise HTTPException(404, f"Run '{run_id}' not found")
-
-    # Handle interruption/cancellation
+    logger.debug("[update_run] commit done (%s) run_id=%s", request.status, run_id)
 
     if request.status == "cancelled":
-        print(
-            f"[update_run] cancelling run_id={run_id} user={user.identity} thread_id={thread_id}"
-        )
         await streaming_service.cancel_run(run_id)
-        print(f"[update_run] set DB status=cancelled run_id={run_id}")
-        await session.execute(
-            update(RunORM)
-            .where(RunORM.run_id == str(run_id))
-            .values(status="cancelled", updated_at=datetime.now(UTC))
-        )
-        await session.commit()
-        print(f"[update_run] commit done (cancelled) run_id={run_id}")
-    elif request.status == "interrupted":
-        print(
-            f"[update_run] interrupt run_id={run_id} user={user.identity} thread_id={thread_id}"
-        )
+    else:
         await streaming_service.interrupt_run(run_id)
-        print(f"[update_run] set DB status=interrupted run_id={run_id}")
-        await session.execute(
-            update(RunORM)
-            .where(RunORM.run_id == str(run_id))
-            .values(status="interrupted", updated_at=datetime.now(UTC))
-        )
-        await session.commit()
-        print(f"[update_run] commit done (interrupted) run_id={run_id}")
+    # A live task drops its own buffer when it settles
+    if run_id not in active_runs:
+        await streaming_service.drop_buffer(run_id)
 
-    # Return final run state
-    run_orm = await session.scalar(select(RunORM).where(RunORM.run_id == run_id))
-    if run_orm:
-        # Refresh to ensure we have the latest data after our own update
-        await session.refresh(run_orm)
-    return Run.model_validate(
-        {c.name: getattr(run_orm, c.name) for c in run_orm.__table__.columns}
-    )
+    return Run.model_validate(run_orm)
 
 
 @router.get("/threads/{thread_id}/runs/{run_id}/join")
@@ -509,7 +645,7 @@ async def join_run(
     # Get run and validate it exists
     run_orm = await session.scalar(
         select(RunORM).where(
-            RunORM.run_id == str(run_id),
+            RunORM.run_id == run_id,
             RunORM.thread_id == thread_id,
             RunORM.user_id == user.identity,
         )
@@ -519,27 +655,19 @@ async def join_run(
 
     # If already completed, return output immediately
     if run_orm.status in ["completed", "failed", "cancelled"]:
-        # Refresh to ensure we have the latest data
-        await session.refresh(run_orm)
         output = getattr(run_orm, "output", None) or {}
         return output
 
-    # Wait for background task to complete
+    # Wait for background task to complete. asyncio.wait only observes the
+    # task: unlike wait_for it never cancels the run on timeout, and the task's
+    # own outcome is read from the DB below rather than re-raised here.
     task = active_runs.get(run_id)
     if task:
-        try:
-            await asyncio.wait_for(task, timeout=30.0)
-        except TimeoutError:
-            # Task is taking too long, but that's okay - we'll check DB status
-            pass
-        except asyncio.CancelledError:
-            # Task was cancelled, that's also okay
-            pass
+        await asyncio.wait([task], timeout=JOIN_TIMEOUT)
 
-    # Return final output from database
-    run_orm = await session.scalar(select(RunORM).where(RunORM.run_id == run_id))
-    if run_orm:
-        await session.refresh(run_orm)  # Refresh to get latest data from DB
+    # Return final output from database; the background task wrote it after
+    # our load, so the row has to be re-read
+    await session.refresh(run_orm)
     output = getattr(run_orm, "output", None) or {}
     return output
 
@@ -555,12 +683,15 @@ async def stream_run(
     session: AsyncSession = Depends(get_session),
 ) -> StreamingResponse:
     """Stream run execution with SSE and reconnection support - persisted metadata."""
-    print(
-        f"[stream_run] fetch for stream run_id={run_id} thread_id={thread_id} user={user.identity}"
+    logger.debug(
+        "[stream_run] fetch for stream run_id=%s thread_id=%s user=%s",
+        run_id,
+        thread_id,
+        user.identity,
     )
     run_orm = await session.scalar(
         select(RunORM).where(
-            RunORM.run_id == str(run_id),
+            RunORM.run_id == run_id,
             RunORM.thread_id == thread_id,
             RunORM.user_id == user.identity,
         )
@@ -568,8 +699,12 @@ async def stream_run(
     if not run_orm:
         raise HTTPException(404, f"Run '{run_id}' not found")
 
-    print(
-        f"[stream_run] status={run_orm.status} user={user.identity} thread_id={thread_id} run_id={run_id}"
+    logger.debug(
+        "[stream_run] status=%s user=%s thread_id=%s run_id=%s",
+        run_orm.status,
+        user.identity,
+        thread_id,
+        run_id,
     )
     # If already terminal, emit a final end event
     if run_orm.status in ["completed", "failed", "cancelled"]:
@@ -577,8 +712,10 @@ async def stream_run(
         async def generate_final() -> AsyncIterator[str]:
             yield create_end_event()
 
-        print(
-            f"[stream_run] starting terminal stream run_id={run_id} status={run_orm.status}"
+        logger.debug(
+            "[stream_run] starting terminal stream run_id=%s status=%s",
+            run_id,
+            run_orm.status,
         )
         return StreamingResponse(
             generate_final(),
@@ -593,9 +730,7 @@ async def stream_run(
     # Stream active or pending runs via broker
 
     # Build a lightweight Pydantic Run from ORM for streaming context (IDs already strings)
-    run_model = Run.model_validate(
-        {c.name: getattr(run_orm, c.name) for c in run_orm.__table__.columns}
-    )
+    run_model = Run.model_validate(run_orm)
 
     return StreamingResponse(
         streaming_service.stream_run_execution(
@@ -633,86 +768,133 @@ async def cancel_run_endpoint(
     - action=interrupt => cooperative interrupt if supported
     - wait=1 => await background task to finish settling
     """
-    print(
-        f"[cancel_run] fetch run run_id={run_id} thread_id={thread_id} user={user.identity}"
+    status = "interrupted" if action == "interrupt" else "cancelled"
+    logger.debug(
+        "[cancel_run] %s run_id=%s user=%s thread_id=%s",
+        action,
+        run_id,
+        user.identity,
+        thread_id,
     )
-    run_orm = await session.scalar(
-        select(RunORM).where(
-            RunORM.run_id == run_id,
-            RunORM.thread_id == thread_id,
-            RunORM.user_id == user.identity,
-        )
+    # Persist the new status; the scoped UPDATE doubles as the existence check
+    run_orm = await persist_run_status(
+        session, run_id, thread_id, user.identity, status
     )
     if not run_orm:
         raise HTTPException(404, f"Run '{run_id}' not found")
 
     if action == "interrupt":
-        print(
-            f"[cancel_run] interrupt run_id={run_id} user={user.identity} thread_id={thread_id}"
-        )
         await streaming_service.interrupt_run(run_id)
-        # Persist status as interrupted
-        await session.execute(
-            update(RunORM)
-            .where(RunORM.run_id == str(run_id))
-            .values(status="interrupted", updated_at=datetime.now(UTC))
-        )
-        await session.commit()
     else:
-        print(
-            f"[cancel_run] cancel run_id={run_id} user={user.identity} thread_id={thread_id}"
-        )
         await streaming_service.cancel_run(run_id)
-        # Persist status as cancelled
-        await session.execute(
-            update(RunORM)
-            .where(RunORM.run_id == str(run_id))
-            .values(status="cancelled", updated_at=datetime.now(UTC))
-        )
-        await session.commit()
+    # A live task drops its own buffer when it settles
+    if run_id not in active_runs:
+        await streaming_service.drop_buffer(run_id)
 
     # Optionally wait for background task
     if wait:
         task = active_runs.get(run_id)
         if task:
-            with contextlib.suppress(asyncio.CancelledError, Exception):
-                await task
+            await _wait_cancelled(run_id, task)
+            # The settled task may have written a final status/output
+            await session.refresh(run_orm)
 
-    # Reload and return updated Run (do NOT delete here; deletion is a separate endpoint)
-    run_orm = await session.scalar(
-        select(RunORM).where(
-            RunORM.run_id == run_id,
-            RunORM.thread_id == thread_id,
-            RunORM.user_id == user.identity,
+    # Return updated Run (do NOT delete here; deletion is a separate endpoint)
+    return Run.model_validate(run_orm)
+
+
+async def _wait_cancelled(run_id: str, task: asyncio.Task) -> None:
+    """Wait up to CANCEL_TIMEOUT for a cancelled run's task to settle.
+
+    The task's own exception is left to its done-callbacks; a task that
+    outlives the timeout keeps running and is only logged.
+    """
+    done, _ = await asyncio.wait([task], timeout=CANCEL_TIMEOUT)
+    if not done:
+        logger.warning(
+            "Run %s did not settle within %.0fs of cancellation", run_id, CANCEL_TIMEOUT
         )
-    )
-    if not run_orm:
-        raise HTTPException(404, f"Run '{run_id}' not found after cancellation")
-    return Run.model_validate(
-        {c.name: getattr(run_orm, c.name) for c in run_orm.__table__.columns}
-    )
 
 
 def _should_skip_event(raw_event: Any) -> bool:
-    """Check if an event should be skipped based on langsmith:nostream tag"""
+    """Check if an event should be skipped based on langsmith:nostream tag
+
+    Called once per streamed event, so the common shape - a tuple ending in a
+    ``(payload, metadata)`` pair - is probed directly and anything that does
+    not fit falls out through the exception handler.
+    """
     try:
-        # Check if the event has metadata with tags containing 'langsmith:nostream'
-        if isinstance(raw_event, tuple) and len(raw_event) >= 2:
-            # For tuple events, check the third element (metadata tuple)
-            metadata_tuple = raw_event[len(raw_event) - 1]
-            if isinstance(metadata_tuple, tuple) and len(metadata_tuple) >= 2:
-                # Get the second item in the metadata tuple
-                metadata = metadata_tuple[1]
-                if isinstance(metadata, dict) and "tags" in metadata:
-                    tags = metadata["tags"]
-                    if isinstance(tags, list) and "langsmith:nostream" in tags:
-                        return True
-        return False
-    except Exception:
+        return "langsmith:nostream" in raw_event[-1][1]["tags"]
+    except (LookupError, TypeError):
         # If we can't parse the event structure, don't skip it
         return False
 
 
+class _ReplayBuffer:
+    """Queues a run's replay events and writes them to the event store.
+
+    A batch is written once it holds EVENT_STORE_BATCH_SIZE events, or
+    EVENT_STORE_FLUSH_INTERVAL seconds after its first event even if no
+    further event arrives (e.g. while a node waits on a slow LLM call).
+    """
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.only_interrupt_updates = False
+        self._pending: list[tuple[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def add(self, event_id: str, raw_event: Any) -> None:
+        self._pending.append((event_id, raw_event))
+        if len(self._pending) >= EVENT_STORE_BATCH_SIZE:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                EVENT_STORE_FLUSH_INTERVAL, self._flush_on_deadline
+            )
+
+    async def flush(self) -> None:
+        """Write every queued event now"""
+        self._cancel_timer()
+        # The lock keeps batches in order when a deadline flush is in flight
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            await streaming_service.store_events_from_raw(
+                self.run_id, batch, only_interrupt_updates=self.only_interrupt_updates
+            )
+
+    async def close(self) -> None:
+        """Stop the deadline timer and write everything still queued"""
+        self._cancel_timer()
+        if self._flushes:
+            await asyncio.wait(self._flushes)
+        await self.flush()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_on_deadline(self) -> None:
+        self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Failed to store replay events for run %s: %s",
+                self.run_id,
+                task.exception(),
+            )
+
+
 async def execute_run_async(
     run_id: str,
     thread_id: str,
@@ -724,16 +906,13 @@ async def execute_run_async(
     stream_mode: list[str] | None = None,
     session: AsyncSession | None = None,
     checkpoint: dict | None = None,
-    command: dict[str, Any] | None = None,
+    command: CommandIn | None = None,
     interrupt_before: str | list[str] | None = None,
     interrupt_after: str | list[str] | None = None,
     _multitask_strategy: str | None = None,
     subgraphs: bool | None = False,
 ) -> None:
-    """Execute run asynchronously in background using streaming to capture all events"""  # Use provided session or get a new one
-    if session is None:
-        maker = _get_session_maker()
-        session = maker()
+    """Execute run asynchronously in background using streaming to capture all events"""
 
     # Normalize stream_mode once here for all callers/endpoints.
     # Accept "messages-tuple" as an alias of "messages".
@@ -747,9 +926,17 @@ async def execute_run_async(
     else:
         stream_mode = _normalize_mode(stream_mode)
 
+    # Events waiting to be written to the replay store
+    replay = _ReplayBuffer(run_id)
+
+    admitted = False
     try:
+        # Queue behind the user's other runs if they are at their limit
+        await run_admission.acquire(user.identity)
+        admitted = True
+
         # Update status
-        await update_run_status(run_id, "running", session=session)
+        await update_run_status(run_id, "running")
 
         # Get graph and execute
         langgraph_service = get_langgraph_service()
@@ -779,11 +966,7 @@ async def execute_run_async(
         # Determine input for execution (either input_data or command)
         if command is not None:
             # When command is provided, it replaces input entirely (LangGraph API behavior)
-            if isinstance(command, dict):
-                execution_input = map_command_to_langgraph(command)
-            else:
-                # Direct resume value (backward compatibility)
-                execution_input = Command(resume=command)
+            execution_input = map_command_to_langgraph(command)
         else:
             # No command, use regular input
             execution_input = input_data
@@ -808,6 +991,7 @@ async def execute_run_async(
             final_stream_modes.append("updates")
 
         only_interrupt_updates = not user_requested_updates
+        replay.only_interrupt_updates = only_interrupt_updates
 
         async with with_auth_ctx(user, []):
             async for raw_event in graph.astream(
@@ -831,82 +1015,74 @@ async def execute_run_async(
                     raw_event,
                     only_interrupt_updates=only_interrupt_updates,
                 )
-                # Store for replay
-                await streaming_service.store_event_from_raw(
-                    run_id,
-                    event_id,
-                    raw_event,
-                    only_interrupt_updates=only_interrupt_updates,
-                )
+                # Queue for replay storage
+                await replay.add(event_id, raw_event)
 
-                # Check for interrupt in this event
+                # Check for interrupt and track final output; one exact type
+                # check per event (astream yields plain tuples)
                 event_data = None
-                if isinstance(raw_event, tuple) and len(raw_event) >= 2:
-                    event_data = raw_event[1]
-                elif not isinstance(raw_event, tuple):
-                    event_data = raw_event
+                if type(raw_event) is tuple:
+                    if len(raw_event) >= 2:
+                        event_data = raw_event[1]
+                        if raw_event[0] == "values":
+                            final_output = event_data
+                else:
+                    # Non-tuple events are values mode
+                    event_data = final_output = raw_event
 
                 if isinstance(event_data, dict) and "__interrupt__" in event_data:
                     has_interrupt = True
 
-                # Track final output
-                if isinstance(raw_event, tuple):
-                    if len(raw_event) >= 2 and raw_event[0] == "values":
-                        final_output = raw_event[1]
-                elif not isinstance(raw_event, tuple):
-                    # Non-tuple events are values mode
-                    final_output = raw_event
+        # Replay must be complete before the terminal status is visible
+        await replay.close()
 
         if has_interrupt:
-            await update_run_status(
-                run_id, "interrupted", output=final_output or {}, session=session
+            await _write_final_status(
+                session,
+                run_id,
+                thread_id,
+                "interrupted",
+                thread_status="interrupted",
+                output=final_output or {},
             )
-            if not session:
-                raise RuntimeError(
-                    f"No database session available to update thread {thread_id} status"
-                )
-            await set_thread_status(session, thread_id, "interrupted")
-
         else:
-            # Update with results
-            await update_run_status(
-                run_id, "completed", output=final_output or {}, session=session
+            # Update with results and mark thread back to idle
+            await _write_final_status(
+                session, run_id, thread_id, "completed", output=final_output or {}
             )
-            # Mark thread back to idle
-            if not session:
-                raise RuntimeError(
-                    f"No database session available to update thread {thread_id} status"
-                )
-            await set_thread_status(session, thread_id, "idle")
 
     except asyncio.CancelledError:
-        # Store empty output to avoid JSON serialization issues
-        await update_run_status(run_id, "cancelled", output={}, session=session)
-        if not session:
-            raise RuntimeError(
-                f"No database session available to update thread {thread_id} status"
-            ) from None
-        await set_thread_status(session, thread_id, "idle")
+        with contextlib.suppress(Exception):
+            await replay.close()
+        # Store empty output to avoid JSON serialization issues. Shielded so a
+        # second cancellation (e.g. shutdown) cannot abort the write halfway
+        await _finish_shielded(
+            _write_final_status(session, run_id, thread_id, "cancelled", output={})
+        )
         # Signal cancellation to broker
         await streaming_service.signal_run_cancelled(run_id)
         raise
     except Exception as e:
+        # Keep whatever replay was produced before the failure; a failing store
+        # must not mask the original error
+        with contextlib.suppress(Exception):
+            await replay.close()
         # Store empty output to avoid JSON serialization issues
-        await update_run_status(
-            run_id, "failed", output={}, error=str(e), session=session
+        await _finish_shielded(
+            _write_final_status(
+                session, run_id, thread_id, "failed", output={}, error=str(e)
+            )
         )
-        if not session:
-            raise RuntimeError(
-                f"No database session available to update thread {thread_id} status"
-            ) from None
-        await set_thread_status(session, thread_id, "idle")
         # Signal error to broker
         await streaming_service.signal_run_error(run_id, str(e))
         raise
     finally:
-        # Clean up broker
+        if admitted:
+            # Shielded so a second cancellation cannot leak the slot
+            await asyncio.shield(run_admission.release(user.identity))
+        # Finish the broker now, but keep it briefly for late reconnects
         await streaming_service.cleanup_run(run_id)
-        active_runs.pop(run_id, None)
+        streaming_service.schedule_buffer_drop(run_id)
 
 
 async def update_run_status(
@@ -916,37 +1092,45 @@ async def update_run_status(
     error: str | None = None,
     session: AsyncSession | None = None,
 ) -> None:
-    """Update run status in database (persisted). If session not provided, opens a short-lived session."""
-    owns_session = False
-    if session is None:
-        maker = _get_session_maker()
-        session = maker()  # type: ignore[assignment]
-        owns_session = True
-    try:
-        values = {"status": status, "updated_at": datetime.now(UTC)}
-        if output is not None:
-            # Serialize output to ensure JSON compatibility
-            try:
-                serialized_output = serializer.serialize(output)
-                values["output"] = serialized_output
-            except Exception as e:
-                logger.warning(f"Failed to serialize output for run {run_id}: {e}")
-                values["output"] = {
-                    "error": "Output serialization failed",
-                    "original_type": str(type(output)),
-                }
-        if error is not None:
-            values["error_message"] = error
-        print(f"[update_run_status] updating DB run_id={run_id} status={status}")
+    """Update run status in database (persisted).
+
+    With a ``session`` the UPDATE joins the caller's transaction and the caller
+    commits. Otherwise the write goes through the run status batcher, which
+    coalesces updates from concurrent runs.
+    """
+    # updated_at is set by the database (func.now()) when the UPDATE runs
+    values = {"status": status}
+    if isinstance(output, dict) and not output:
+        # Empty output (cancel/fail paths, runs without values) needs no walk
+        values["output"] = {}
+    elif output is not None:
+        # Serialize output to ensure JSON compatibility
+        try:
+            serialized_output = serializer.serialize(output)
+            values["output"] = serialized_output
+        except Exception as e:
+            logger.warning("Failed to serialize output for run %s: %s", run_id, e)
+            values["output"] = {
+                "error": "Output serialization failed",
+                "original_type": str(type(output)),
+            }
+    if error is not None:
+        values["error_message"] = error
+    logger.debug("[update_run_status] updating DB run_id=%s status=%s", run_id, status)
+    if session is not None:
+        # A queued batch update must not land after this direct write
+        run_status_batcher.discard(run_id)
         await session.execute(
-            update(RunORM).where(RunORM.run_id == str(run_id)).values(**values)
-        )  # type: ignore[arg-type]
-        await session.commit()
-        print(f"[update_run_status] commit done run_id={run_id}")
-    finally:
-        # Close only if we created it here
-        if owns_session:
-            await session.close()  # type: ignore[func-returns-value]
+            update(RunORM)
+            .where(RunORM.run_id == run_id)
+            .values(updated_at=func.now(), **values)
+        )
+        return
+    # The start-of-run transition is batched without blocking the run; other
+    # statuses are written immediately and awaited
+    running = status == "running"
+    await run_status_batcher.submit(run_id, values, flush=not running, wait=not running)
+    logger.debug("[update_run_status] commit done run_id=%s", run_id)
 
 
 @router.delete("/threads/{thread_id}/runs/{run_id}", status_code=204)
@@ -964,53 +1148,78 @@ async def delete_run(
 
     Behavior:
     - If the run is active (pending/running/streaming) and force=0, returns 409 Conflict.
-    - If force=1 and the run is active, cancels it first (best-effort) and then deletes.
+    - If force=1 and the run is active, deletes it and then cancels it (best-effort).
     - Always returns 204 No Content on successful deletion.
     """
-    print(
-        f"[delete_run] fetch run run_id={run_id} thread_id={thread_id} user={user.identity}"
+    logger.debug(
+        "[delete_run] delete run run_id=%s thread_id=%s user=%s",
+        run_id,
+        thread_id,
+        user.identity,
     )
-    run_orm = await session.scalar(
-        select(RunORM).where(
-            RunORM.run_id == str(run_id),
-            RunORM.thread_id == thread_id,
-            RunORM.user_id == user.identity,
-        )
+    active_statuses = ("pending", "running", "streaming")
+    scope = (
+        RunORM.run_id == run_id,
+        RunORM.thread_id == thread_id,
+        RunORM.user_id == user.identity,
     )
-    if not run_orm:
-        raise HTTPException(404, f"Run '{run_id}' not found")
 
-    # If active and not forcing, reject deletion
-    if run_orm.status in ["pending", "running", "streaming"] and not force:
-        raise HTTPException(
-            status_code=409,
-            detail="Run is active. Retry with force=1 to cancel and delete.",
+    cancel = False
+    if force:
+        # Lock the row until commit so concurrent force deletes of the same
+        # run do not both cancel it; a locked row is skipped, not waited on
+        run_orm = await session.get(
+            RunORM, run_id, with_for_update={"skip_locked": True}
         )
+        if run_orm is None:
+            status = await session.scalar(select(RunORM.status).where(*scope))
+            if status is not None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Run is locked by another request. Retry shortly.",
+                )
+            raise HTTPException(404, f"Run '{run_id}' not found")
+        if run_orm.thread_id != thread_id or run_orm.user_id != user.identity:
+            raise HTTPException(404, f"Run '{run_id}' not found")
 
-    # If forcing and active, cancel first
-    if force and run_orm.status in ["pending", "running", "streaming"]:
-        print(f"[delete_run] force-cancelling active run run_id={run_id}")
-        await streaming_service.cancel_run(run_id)
-        # Best-effort: wait for bg task to settle
-        task = active_runs.get(run_id)
-        if task:
-            with contextlib.suppress(asyncio.CancelledError, Exception):
-                await task
+        # Cancellation writes the run's status from other sessions, which
+        # would block on the row lock, so it is sent only after commit
+        cancel = run_orm.status in active_statuses
 
-    # Delete the record
-    await session.execute(
-        delete(RunORM).where(
-            RunORM.run_id == str(run_id),
-            RunORM.thread_id == thread_id,
-            RunORM.user_id == user.identity,
+        deleted = await session.scalar(
+            delete(RunORM).where(RunORM.run_id == run_id).returning(RunORM.run_id)
         )
-    )
+    else:
+        # A settled run is authorized and deleted in one round-trip. The
+        # thread/user predicates stay in the DELETE: they are the ownership
+        # check, and only filter the single row the primary key finds
+        deleted = await session.scalar(
+            delete(RunORM)
+            .where(*scope, RunORM.status.not_in(active_statuses))
+            .returning(RunORM.run_id)
+        )
+        if deleted is None:
+            # Nothing deleted: tell an active run apart from a missing one
+            status = await session.scalar(select(RunORM.status).where(*scope))
+            if status is not None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Run is active. Retry with force=1 to cancel and delete.",
+                )
+
+    if deleted is None:
+        raise HTTPException(404, f"Run '{run_id}' not found")
     await session.commit()
 
+    if cancel:
+        logger.debug("[delete_run] force-cancelling active run run_id=%s", run_id)
+        await streaming_service.cancel_run(run_id)
+
     # Clean up active task if exists
     task = active_runs.pop(run_id, None)
     if task and not task.done():
         task.cancel()
+        await _wait_cancelled(run_id, task)
 
     # 204 No Content
     return
@@ -6,9 +6,11 @@ using Starlette's AuthenticationMiddleware.
 """
 
 import importlib.util
+import inspect
 import logging
 import os
 import sys
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Any
 
@@ -58,8 +60,8 @@ class LangGraphUser(BaseUser):
         )
 
     def to_dict(self) -> MinimalUserDict:
-        """Return the underlying user data dict"""
-        return self._user_data.copy()
+        """Return a copy of the underlying user data as a dict"""
+        return dict(self._user_data)
 
 
 class LangGraphAuthBackend(AuthenticationBackend):
@@ -137,10 +139,13 @@ class LangGraphAuthBackend(AuthenticationBackend):
                 for key, value in conn.headers.items()
             }
 
-            # Call LangGraph's authenticate handler
-            user_data = await self.auth_instance._authenticate_handler(headers)
+            # Call LangGraph's authenticate handler. Plain (non-async) handlers
+            # are supported so trivial ones can skip creating a coroutine.
+            user_data = self.auth_instance._authenticate_handler(headers)
+            if inspect.isawaitable(user_data):
+                user_data = await user_data
 
-            if not user_data or not isinstance(user_data, dict):
+            if not user_data or not isinstance(user_data, Mapping):
                 raise AuthenticationError(
                     "Invalid user data returned from auth handler"
                 )
@@ -161,7 +166,9 @@ class LangGraphAuthBackend(AuthenticationBackend):
             return credentials, user
 
         except Auth.exceptions.HTTPException as e:
-            logger.warning(f"Authentication failed: {e.detail}")
+            # Rejections are counted and rate-limited by the auth handler's
+            # own warnings; a per-request record here would undo that
+            logger.debug("Authentication failed: %s", e.detail)
             raise AuthenticationError(e.detail) from e
 
         except Exception as e:
@@ -197,7 +204,7 @@ def on_auth_error(conn: HTTPConnection, exc: AuthenticationError) -> JSONRespons
     Returns:
         JSON response with Agent Protocol error format
     """
-    logger.warning(f"Authentication error for {conn.url}: {exc}")
+    logger.debug("Authentication error for %s: %s", conn.url, exc)
 
     return JSONResponse(
         status_code=401,
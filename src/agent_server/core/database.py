@@ -3,10 +3,13 @@
 import os
 from typing import Any
 
+import orjson
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from langgraph.store.postgres.aio import AsyncPostgresStore
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
+from .serializers import json_dumps
+
 
 class DatabaseManager:
     """Manages database connections and LangGraph persistence components"""
@@ -27,6 +30,8 @@ class DatabaseManager:
         self.engine = create_async_engine(
             self._database_url,
             echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
+            json_serializer=json_dumps,
+            json_deserializer=orjson.loads,
         )
 
         # Convert asyncpg URL to psycopg format for LangGraph
@@ -5,7 +5,8 @@ This module creates:
 • `Assistant`, `Thread`, `Run` – ORM models mirroring the bootstrap tables
   already created in ``DatabaseManager._create_metadata_tables``.
 • `async_session_maker` – a factory that hands out `AsyncSession` objects
-  bound to the shared engine managed by `db_manager`.
+  bound to the shared engine managed by `db_manager` (bound at startup by
+  `init_session_maker`).
 • `get_session` – FastAPI dependency helper for routers.
 
 Nothing is auto-imported by FastAPI yet; routers will `from ...core.db import get_session`.
@@ -25,7 +26,7 @@ from sqlalchemy import (
     text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column
 
 Base = declarative_base()
@@ -150,6 +151,13 @@ class Run(Base):
         Index("idx_runs_status", "status"),
         Index("idx_runs_assistant_id", "assistant_id"),
         Index("idx_runs_created_at", "created_at"),
+        # Serves list_runs: filter on thread/user, newest first
+        Index(
+            "idx_runs_thread_user_created",
+            "thread_id",
+            "user_id",
+            text("created_at DESC"),
+        ),
     )
 
 
@@ -179,6 +187,13 @@ class RunEvent(Base):
 async_session_maker: async_sessionmaker[AsyncSession] | None = None
 
 
+def init_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Bind the shared session maker to ``engine``; called once at startup."""
+    global async_session_maker
+    async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    return async_session_maker
+
+
 def _get_session_maker() -> async_sessionmaker[AsyncSession]:
     """Return a cached async_sessionmaker bound to db_manager.engine."""
     global async_session_maker
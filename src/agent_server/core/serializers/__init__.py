@@ -1,7 +1,8 @@
 """Serialization layer for LangGraph and general objects"""
 
 from .base import Serializer
+from .fast_json import json_dumps
 from .general import GeneralSerializer
 from .langgraph import LangGraphSerializer
 
-__all__ = ["Serializer", "GeneralSerializer", "LangGraphSerializer"]
+__all__ = ["Serializer", "GeneralSerializer", "LangGraphSerializer", "json_dumps"]
@@ -0,0 +1,26 @@
+"""Compact JSON text encoding backed by orjson"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+
+
+def json_dumps(
+    value: Any,
+    default: Callable[[Any], Any] | None = None,
+    option: int = 0,
+) -> str:
+    """Encode ``value`` as compact JSON text with orjson
+
+    Non-string dict keys are always allowed; ``option`` adds further orjson
+    flags. Values orjson rejects (e.g. integers over 64 bits) fall back to
+    the stdlib encoder with the same compact separators.
+    """
+    try:
+        return orjson.dumps(
+            value, default=default, option=orjson.OPT_NON_STR_KEYS | option
+        ).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(value, default=default, separators=(",", ":"))
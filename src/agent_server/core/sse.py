@@ -6,12 +6,19 @@ from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
 
+import orjson
+
 # Import our serializer for handling complex objects
-from .serializers import GeneralSerializer
+from .serializers import GeneralSerializer, json_dumps
 
 # Global serializer instance
 _serializer = GeneralSerializer()
 
+# Datetimes and dataclasses are passed through to the serializer so the wire
+# format (and any custom serializer) sees them exactly as with the stdlib
+# encoder.
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
 
 def get_sse_headers() -> dict[str, str]:
     """Get standard SSE headers"""
@@ -48,7 +55,7 @@ def format_sse_message(
     else:
         # Use our general serializer by default to handle complex objects
         default_serializer = serializer or _serializer.serialize
-        data_str = json.dumps(data, default=default_serializer, separators=(",", ":"))
+        data_str = json_dumps(data, default_serializer, _ORJSON_OPTIONS)
 
     lines.append(f"data: {data_str}")
 
@@ -3,7 +3,7 @@
 import asyncio
 import os
 import sys
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -21,33 +21,82 @@ if str(graphs_dir) not in sys.path:
 
 # ruff: noqa: E402 - imports below require sys.path modification above
 import logging
+import logging.handlers
+import queue
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from starlette.middleware.authentication import AuthenticationMiddleware
 
 from .api.assistants import router as assistants_router
+from .api.runs import active_runs
 from .api.runs import router as runs_router
 from .api.store import router as store_router
 from .api.threads import router as threads_router
 from .core.auth_middleware import get_auth_backend, on_auth_error
 from .core.database import db_manager
 from .core.health import router as health_router
+from .core.orm import init_session_maker
 from .middleware import DoubleEncodedJSONMiddleware
 from .models.errors import AgentProtocolError, get_error_type
 
-# Task management for run cancellation
-active_runs: dict[str, asyncio.Task] = {}
 
+def _configure_logging() -> None:
+    """Configure the root logger once, writing records to stderr"""
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[stream_handler]
+    )
+
+
+def _start_queued_logging() -> Callable[[], None]:
+    """Move root log output to a background thread until the returned stop()
+
+    While active, the root logger only enqueues records; a QueueListener does
+    the formatting and stream I/O off the event loop. stop() drains the queue
+    and restores the original handlers.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+
+    def stop() -> None:
+        listener.stop()
+        root.handlers = handlers
+
+    return stop
+
+
+_configure_logging()
 logger = logging.getLogger(__name__)
 
+# Seconds shutdown waits for cancelled runs to finish their cleanup
+SHUTDOWN_TIMEOUT = 10.0
+
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     """FastAPI lifespan context manager for startup/shutdown"""
+    # Log I/O runs on a background thread only while the app is serving
+    stop_queued_logging = _start_queued_logging()
+
+    # Start new tasks eagerly (Python 3.12+): a freshly created run executes up
+    # to its first real I/O wait immediately instead of on the next loop tick
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
+
     # Startup: Initialize database and LangGraph components
     await db_manager.initialize()
+    # Bind the shared session maker to the new engine up front
+    init_session_maker(db_manager.get_engine())
 
     # Initialize LangGraph service
     from .services.langgraph_service import get_langgraph_service
@@ -60,18 +109,38 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
 
     await event_store.start_cleanup_task()
 
+    # Start coalescing run status writes
+    from .services.run_status_batcher import run_status_batcher
+
+    await run_status_batcher.start()
+
     yield
 
-    # Shutdown: Clean up connections and cancel active runs
-    for task in active_runs.values():
-        if not task.done():
-            task.cancel()
+    # Shutdown: cancel active runs and let their cleanup (terminal status
+    # writes, session release) finish before the pool is torn down
+    tasks = [task for task in active_runs.values() if not task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+        if pending:
+            logger.warning(
+                "%d run(s) did not finish cancelling within %ss",
+                len(pending),
+                SHUTDOWN_TIMEOUT,
+            )
 
     # Stop event store cleanup task
     await event_store.stop_cleanup_task()
 
+    # Write any queued run statuses before the engine goes away
+    await run_status_batcher.stop()
+
     await db_manager.close()
 
+    # Flushes records logged during shutdown
+    stop_queued_logging()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -83,10 +152,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Add CORS middleware
+# Add CORS middleware. Origins come from CORS_ORIGINS (comma-separated);
+# an explicit list is matched by set membership instead of echoing any Origin
+cors_origins = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -109,31 +184,35 @@ app.include_router(store_router, prefix="", tags=["Store"])
 
 
 # Error handling
+# Error bodies are rendered with pydantic's model_dump_json (pydantic-core)
+# straight into the response, skipping the dict + json.dumps round-trip
 @app.exception_handler(HTTPException)
 async def agent_protocol_exception_handler(
     _request: Request, exc: HTTPException
-) -> JSONResponse:
+) -> Response:
     """Convert HTTP exceptions to Agent Protocol error format"""
-    return JSONResponse(
+    error = AgentProtocolError(
+        error=get_error_type(exc.status_code),
+        message=exc.detail,
+        details=getattr(exc, "details", None),
+    )
+    return Response(
+        error.model_dump_json(),
         status_code=exc.status_code,
-        content=AgentProtocolError(
-            error=get_error_type(exc.status_code),
-            message=exc.detail,
-            details=getattr(exc, "details", None),
-        ).model_dump(),
+        media_type="application/json",
     )
 
 
 @app.exception_handler(Exception)
-async def general_exception_handler(_request: Request, exc: Exception) -> JSONResponse:
+async def general_exception_handler(_request: Request, exc: Exception) -> Response:
     """Handle unexpected exceptions"""
-    return JSONResponse(
-        status_code=500,
-        content=AgentProtocolError(
-            error="internal_error",
-            message="An unexpected error occurred",
-            details={"exception": str(exc)},
-        ).model_dump(),
+    error = AgentProtocolError(
+        error="internal_error",
+        message="An unexpected error occurred",
+        details={"exception": str(exc)},
+    )
+    return Response(
+        error.model_dump_json(), status_code=500, media_type="application/json"
     )
 
 
@@ -149,4 +228,12 @@ if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)  # nosec B104 - binding to all interfaces is intentional
+    # uvicorn[standard] installs uvloop and httptools; "auto" picks them up
+    # and falls back to asyncio/h11 where they are unavailable (e.g. Windows)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",  # nosec B104 - binding to all interfaces is intentional
+        port=port,
+        loop="auto",
+        http="auto",
+    )
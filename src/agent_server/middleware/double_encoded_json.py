@@ -5,6 +5,8 @@ from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
 
 class DoubleEncodedJSONMiddleware:
     """Middleware to handle double-encoded JSON payloads from frontend.
@@ -18,15 +20,15 @@ class DoubleEncodedJSONMiddleware:
         self.app = app
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if scope["type"] != "http":
+        # Requests without a body (GET, health probes, docs) skip header parsing
+        if scope["type"] != "http" or scope["method"] not in _BODY_METHODS:
             await self.app(scope, receive, send)
             return
 
-        method = scope["method"]
         headers = dict(scope.get("headers", []))
         content_type = headers.get(b"content-type", b"").decode("latin1")
 
-        if method in ["POST", "PUT", "PATCH"] and content_type:
+        if content_type:
             body_parts = []
 
             async def receive_wrapper() -> dict:
@@ -37,15 +39,21 @@ class DoubleEncodedJSONMiddleware:
                     if not message.get("more_body", False):
                         body = b"".join(body_parts)
 
-                        if body:
+                        # Only a JSON string literal can be double-encoded, so
+                        # plain JSON bodies are passed on without a parse and
+                        # re-encode round-trip
+                        if body and (
+                            content_type != "application/json"
+                            or body.lstrip().startswith(b'"')
+                        ):
                             try:
                                 decoded = body.decode("utf-8")
                                 parsed = json.loads(decoded)
 
+                                new_body = body
                                 if isinstance(parsed, str):
                                     parsed = json.loads(parsed)
-
-                                new_body = json.dumps(parsed).encode("utf-8")
+                                    new_body = json.dumps(parsed).encode("utf-8")
 
                                 if (
                                     b"content-type" in headers
@@ -10,7 +10,7 @@ from .assistants import (
 )
 from .auth import AuthContext, TokenPayload, User
 from .errors import AgentProtocolError, get_error_type
-from .runs import Run, RunCreate, RunStatus
+from .runs import CommandIn, Run, RunCreate, RunStatus, SendIn
 from .store import (
     StoreDeleteRequest,
     StoreGetResponse,
@@ -53,6 +53,8 @@ __all__ = [
     "Run",
     "RunCreate",
     "RunStatus",
+    "CommandIn",
+    "SendIn",
     # Store
     "StorePutRequest",
     "StoreGetResponse",
@@ -1,14 +1,20 @@
 """Authentication and user context models"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class User(BaseModel):
-    """User context model for authentication"""
+    """User context model for authentication
+
+    Frozen (and therefore hashable) so a resolved user can be shared and
+    cached safely across a request and its background run.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="ignore")
 
     identity: str
     display_name: str | None = None
-    permissions: list[str] = []
+    permissions: tuple[str, ...] = ()
     org_id: str | None = None
     is_authenticated: bool = True
 
@@ -16,12 +22,11 @@ class User(BaseModel):
 class AuthContext(BaseModel):
     """Authentication context for request processing"""
 
+    model_config = ConfigDict(frozen=True)
+
     user: User
     request_id: str | None = None
 
-    class Config:
-        arbitrary_types_allowed = True
-
 
 class TokenPayload(BaseModel):
     """JWT token payload structure"""
@@ -3,7 +3,34 @@
 from datetime import datetime
 from typing import Any, Self
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+class SendIn(BaseModel):
+    """Send a payload to a specific graph node"""
+
+    node: str = Field(..., description="Node to send the input to")
+    input: Any = Field(None, description="Input passed to the node")
+
+
+class CommandIn(BaseModel):
+    """Command for resuming or steering an interrupted run"""
+
+    goto: list[str | SendIn] | None = Field(
+        None, description="Node name(s) or Send payload(s) to navigate to next"
+    )
+    update: dict[str, Any] | list[tuple[str, Any]] | None = Field(
+        None, description="State update as a mapping or a list of (key, value) pairs"
+    )
+    resume: Any = Field(None, description="Value to resume an interrupt with")
+
+    @field_validator("goto", mode="before")
+    @classmethod
+    def wrap_single_goto(cls, value: Any) -> Any:
+        """Accept a single goto target as shorthand for a one-item list"""
+        if value is None or isinstance(value, list):
+            return value
+        return [value]
 
 
 class RunCreate(BaseModel):
@@ -37,7 +64,7 @@ class RunCreate(BaseModel):
     )
 
     # Human-in-the-loop fields (core HITL functionality)
-    command: dict[str, Any] | None = Field(
+    command: CommandIn | None = Field(
         None,
         description="Command for resuming interrupted runs with state updates or navigation",
     )
@@ -76,6 +103,8 @@ class RunCreate(BaseModel):
 class Run(BaseModel):
     """Run entity model"""
 
+    model_config = ConfigDict(from_attributes=True)
+
     run_id: str
     thread_id: str
     assistant_id: str
@@ -89,9 +118,6 @@ class Run(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class RunStatus(BaseModel):
     """Simple run status response"""
@@ -0,0 +1,92 @@
+"""Per-user admission control for background run execution"""
+
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class Admission:
+    """Counting gate built on a Condition
+
+    Unlike ``asyncio.Semaphore`` it tracks how many tasks hold and wait for
+    slots, so idle gates can be dropped.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._cv = asyncio.Condition()
+        self._limit = limit
+        self.active = 0
+        self.waiting = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free and take it"""
+        async with self._cv:
+            self.waiting += 1
+            try:
+                await self._cv.wait_for(lambda: self.active < self._limit)
+            except asyncio.CancelledError:
+                # A notify() delivered to this waiter would otherwise be lost
+                # with it; pass the wake-up on to the next waiter
+                self._cv.notify(1)
+                raise
+            finally:
+                self.waiting -= 1
+            self.active += 1
+
+    async def release(self) -> None:
+        """Give back a slot and wake one waiter"""
+        async with self._cv:
+            self.active -= 1
+            self._cv.notify(1)
+
+    def is_idle(self) -> bool:
+        return self.active == 0 and self.waiting == 0
+
+
+class RunAdmission:
+    """Caps how many runs each user can execute concurrently
+
+    Runs over the limit are queued (they stay ``pending``) rather than
+    rejected. A limit of 0 or less disables admission control; it is the
+    default because with noop auth every caller shares one identity.
+    """
+
+    def __init__(self, max_per_user: int) -> None:
+        self.max_per_user = max_per_user
+        self._gates: dict[str, Admission] = {}
+
+    async def acquire(self, user_id: str) -> None:
+        """Wait for an execution slot for ``user_id``"""
+        if self.max_per_user <= 0:
+            return
+        gate = self._gates.get(user_id)
+        if gate is None:
+            gate = self._gates[user_id] = Admission(self.max_per_user)
+        if gate.active >= gate.limit:
+            logger.debug("Run for user %s queued for admission", user_id)
+        try:
+            await gate.acquire()
+        finally:
+            self._discard_idle(user_id, gate)
+
+    async def release(self, user_id: str) -> None:
+        """Return an execution slot taken by :meth:`acquire`"""
+        gate = self._gates.get(user_id)
+        if gate is None:
+            return
+        await gate.release()
+        self._discard_idle(user_id, gate)
+
+    def _discard_idle(self, user_id: str, gate: Admission) -> None:
+        if gate.is_idle() and self._gates.get(user_id) is gate:
+            del self._gates[user_id]
+
+
+# Global admission controller for run execution
+run_admission = RunAdmission(int(os.getenv("MAX_RUNS_PER_USER", "0")))
@@ -36,10 +36,27 @@ class EventStore:
 
         We expect event.id format: f"{run_id}_event_{seq}".
         """
-        try:
-            seq = int(str(event.id).split("_event_")[-1])
-        except Exception:
-            seq = 0
+        await self.store_events(run_id, [event])
+
+    async def store_events(self, run_id: str, events: list[SSEEvent]) -> None:
+        """Persist a batch of events in one transaction (executemany)."""
+        if not events:
+            return
+        params = []
+        for event in events:
+            try:
+                seq = int(str(event.id).split("_event_")[-1])
+            except Exception:
+                seq = 0
+            params.append(
+                {
+                    "id": event.id,
+                    "run_id": run_id,
+                    "seq": seq,
+                    "event": event.event,
+                    "data": event.data,
+                }
+            )
         engine = db_manager.get_engine()
         async with engine.begin() as conn:
             stmt = text(
@@ -49,16 +66,7 @@ class EventStore:
                 ON CONFLICT (id) DO NOTHING
                 """
             ).bindparams(bindparam("data", type_=JSONB))
-            await conn.execute(
-                stmt,
-                {
-                    "id": event.id,
-                    "run_id": run_id,
-                    "seq": seq,
-                    "event": event.event,
-                    "data": event.data,
-                },
-            )
+            await conn.execute(stmt, params)
 
     async def get_events_since(self, run_id: str, last_event_id: str) -> list[SSEEvent]:
         """Fetch all events for run after last_event_id sequence."""
@@ -177,10 +185,8 @@ class EventStore:
 event_store = EventStore()
 
 
-async def store_sse_event(
-    run_id: str, event_id: str, event_type: str, data: dict
-) -> SSEEvent:
-    """Store SSE event with proper serialization"""
+def build_sse_event(event_id: str, event_type: str, data: dict) -> SSEEvent:
+    """Build a storable SSE event with JSONB-safe data"""
     serializer = GeneralSerializer()
 
     # Ensure JSONB-safe data by serializing complex objects
@@ -189,8 +195,15 @@ async def store_sse_event(
     except Exception:
         # Fallback to stringifying as a last resort to avoid crashing the run
         safe_data = {"raw": str(data)}
-    event = SSEEvent(
+    return SSEEvent(
         id=event_id, event=event_type, data=safe_data, timestamp=datetime.now(UTC)
     )
+
+
+async def store_sse_event(
+    run_id: str, event_id: str, event_type: str, data: dict
+) -> SSEEvent:
+    """Store SSE event with proper serialization"""
+    event = build_sse_event(event_id, event_type, data)
     await event_store.store_event(run_id, event)
     return event
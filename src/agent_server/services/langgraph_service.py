@@ -3,7 +3,9 @@
 import importlib.util
 import json
 import os
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, TypeVar
 from uuid import uuid5
 
@@ -24,6 +26,8 @@ class LangGraphService:
         self.config: dict[str, Any] | None = None
         self._graph_registry: dict[str, Any] = {}
         self._graph_cache: dict[str, Any] = {}
+        # Lazily built graph_id -> file_path view; reset when graphs register
+        self._graph_list: Mapping[str, str] | None = None
 
     async def initialize(self):
         """Load configuration file and setup graph registry.
@@ -82,6 +86,7 @@ class LangGraphService:
                 "file_path": file_path,
                 "export_name": export_name,
             }
+        self._graph_list = None
 
     async def _ensure_default_assistants(self) -> None:
         """Create a default assistant per graph with deterministic UUID.
@@ -199,12 +204,20 @@ class LangGraphService:
         # If it needs our checkpointer/store, we'll handle that during execution
         return graph
 
-    def list_graphs(self) -> dict[str, str]:
-        """List all available graphs"""
-        return {
-            graph_id: info["file_path"]
-            for graph_id, info in self._graph_registry.items()
-        }
+    def list_graphs(self) -> Mapping[str, str]:
+        """List all available graphs
+
+        The mapping is built once per registry load and shared between
+        callers as a read-only view.
+        """
+        if self._graph_list is None:
+            self._graph_list = MappingProxyType(
+                {
+                    graph_id: info["file_path"]
+                    for graph_id, info in self._graph_registry.items()
+                }
+            )
+        return self._graph_list
 
     def invalidate_cache(self, graph_id: str = None):
         """Invalidate graph cache for hot-reload"""
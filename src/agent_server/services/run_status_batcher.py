@@ -0,0 +1,197 @@
+"""Coalesced run status writes"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.orm import Run as RunORM
+from ..core.orm import _get_session_maker
+from ..core.serializers import json_dumps
+
+logger = logging.getLogger(__name__)
+
+# A "running" write only applies to runs that have not settled yet, so a
+# late batch cannot overwrite a final status written on another session
+_STARTABLE_STATUSES = ("pending", "running")
+
+# Output and error are only written when given, matching update_run_status
+_BULK_UPDATE_SQL = (
+    f"UPDATE {RunORM.__tablename__} SET status = $1,"
+    " output = COALESCE($2::jsonb, output),"
+    " error_message = COALESCE($3, error_message),"
+    " updated_at = now()"
+    " WHERE run_id = $4"
+    " AND ($1 <> 'running' OR status IN ('pending', 'running'))"
+)
+
+
+async def update_run_statuses_bulk(
+    session: AsyncSession, rows: list[dict[str, Any]]
+) -> None:
+    """Apply many run status updates with one asyncpg ``executemany``
+
+    Bypasses SQLAlchemy statement compilation and parameter processing for
+    large batches. Each row needs ``run_id`` and ``status``; ``output`` and
+    ``error_message`` are optional.
+    """
+    args = [
+        (
+            row["status"],
+            json_dumps(row["output"]) if "output" in row else None,
+            row.get("error_message"),
+            row["run_id"],
+        )
+        for row in rows
+    ]
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    # asyncpg's executemany is atomic on its own; output is passed as JSON
+    # text for the jsonb codec SQLAlchemy installs on each connection
+    await raw.driver_connection.executemany(_BULK_UPDATE_SQL, args)
+
+
+class RunStatusBatcher:
+    """Collects run status updates and writes them in one statement per flush
+
+    Updates submitted within ``interval`` seconds of each other share a
+    transaction; repeated updates to the same run are merged so only the
+    latest values are written, and ``updated_at`` is stamped by the database.
+    :meth:`submit` returns once its update is committed, so callers keep
+    read-after-write semantics.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+        bulk_threshold: int = 32,
+    ) -> None:
+        self.interval = interval
+        self.bulk_threshold = bulk_threshold
+        self._session_maker = session_maker
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._waiters: list[asyncio.Future[None]] = []
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+        await self.flush()
+
+    async def submit(
+        self,
+        run_id: str,
+        values: dict[str, Any],
+        *,
+        flush: bool = False,
+        wait: bool = True,
+    ) -> None:
+        """Queue an update for ``run_id`` and wait until it is committed
+
+        ``flush=True`` writes the batch immediately instead of waiting out the
+        interval; terminal statuses use it so they are durable without delay.
+        ``wait=False`` returns as soon as the update is queued. If the
+        submitter is cancelled before the write starts, the run's queued
+        update is withdrawn.
+        """
+        self._pending.setdefault(run_id, {}).update(values)
+        flusher_running = self._task is not None and not self._task.done()
+        if not wait and flusher_running and not flush:
+            self._wake.set()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # Without a background flusher (e.g. outside the app lifespan)
+            # write now
+            if flush or not flusher_running:
+                await self.flush()
+            else:
+                self._wake.set()
+            await waiter
+        except asyncio.CancelledError:
+            self.discard(run_id)
+            raise
+
+    def discard(self, run_id: str) -> None:
+        """Drop any queued update for ``run_id`` that has not been written
+
+        Callers that write a run's status directly use this so a stale
+        queued update cannot land after theirs.
+        """
+        self._pending.pop(run_id, None)
+
+    async def flush(self) -> None:
+        """Write every queued update now"""
+        async with self._lock:
+            # Waiters are taken even when nothing is pending: a discarded
+            # update still has a submitter waiting for this flush
+            batch, self._pending = self._pending, {}
+            waiters, self._waiters = self._waiters, []
+            try:
+                if batch:
+                    await self._write(batch)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                raise
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def _write(self, batch: dict[str, dict[str, Any]]) -> None:
+        maker = self._session_maker or _get_session_maker()
+        rows = [{"run_id": run_id, **values} for run_id, values in batch.items()]
+        async with maker() as session:
+            if len(rows) >= self.bulk_threshold:
+                # Bursts (e.g. mass cancellation) skip ORM compilation entirely
+                await update_run_statuses_bulk(session, rows)
+            else:
+                starts = [row for row in rows if row["status"] == "running"]
+                others = [row for row in rows if row["status"] != "running"]
+                # ORM bulk UPDATE by primary key: one executemany per column set
+                if starts:
+                    await session.execute(
+                        update(RunORM)
+                        .where(RunORM.status.in_(_STARTABLE_STATUSES))
+                        .values(updated_at=func.now())
+                        .execution_options(synchronize_session=None),
+                        starts,
+                    )
+                if others:
+                    await session.execute(
+                        update(RunORM).values(updated_at=func.now()), others
+                    )
+            await session.commit()
+        logger.debug("Wrote status for %d run(s)", len(batch))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wake.wait()
+            # Linger so updates from concurrent runs land in the same batch
+            await asyncio.sleep(self.interval)
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # Waiters already received the error
+                logger.exception("Failed to write run status batch")
+
+
+# Global run status batcher
+run_status_batcher = RunStatusBatcher()
@@ -5,15 +5,18 @@ import logging
 from collections.abc import AsyncIterator
 from typing import Any
 
-from ..core.sse import create_error_event, create_metadata_event
+from ..core.sse import SSEEvent, create_error_event, create_metadata_event
 from ..models import Run
 from ..utils import extract_event_sequence, generate_event_id
 from .broker import broker_manager
 from .event_converter import EventConverter
-from .event_store import event_store, store_sse_event
+from .event_store import build_sse_event, event_store
 
 logger = logging.getLogger(__name__)
 
+# Seconds a finished run's live buffer is kept for late reconnecting clients
+BUFFER_RETENTION_SECONDS = 60.0
+
 
 class StreamingService:
     """Service to handle SSE streaming orchestration with LangGraph compatibility"""
@@ -85,11 +88,38 @@ class StreamingService:
         only_interrupt_updates: bool = False,
     ):
         """Convert raw event to stored format and store it"""
+        event = self._build_stored_event(event_id, raw_event, only_interrupt_updates)
+        if event is not None:
+            await event_store.store_event(run_id, event)
+
+    async def store_events_from_raw(
+        self,
+        run_id: str,
+        raw_events: list[tuple[str, Any]],
+        only_interrupt_updates: bool = False,
+    ):
+        """Convert a batch of ``(event_id, raw_event)`` pairs and store them together"""
+        events = [
+            event
+            for event_id, raw_event in raw_events
+            if (
+                event := self._build_stored_event(
+                    event_id, raw_event, only_interrupt_updates
+                )
+            )
+            is not None
+        ]
+        await event_store.store_events(run_id, events)
+
+    def _build_stored_event(
+        self, event_id: str, raw_event: Any, only_interrupt_updates: bool
+    ) -> SSEEvent | None:
+        """Convert a raw event to its stored form, or None if it is not stored"""
         processed_event, should_skip = self._process_interrupt_updates(
             raw_event, only_interrupt_updates
         )
         if should_skip:
-            return
+            return None
 
         # Parse the processed event
         node_path = None
@@ -107,8 +137,7 @@ class StreamingService:
 
         # Store based on stream mode
         if stream_mode_label == "messages":
-            await store_sse_event(
-                run_id,
+            return build_sse_event(
                 event_id,
                 "messages",
                 {
@@ -123,15 +152,13 @@ class StreamingService:
                 },
             )
         elif stream_mode_label == "values" or stream_mode_label == "updates":
-            await store_sse_event(
-                run_id,
+            return build_sse_event(
                 event_id,
                 "values",
                 {"type": "execution_values", "chunk": event_payload},
             )
         elif stream_mode_label == "end":
-            await store_sse_event(
-                run_id,
+            return build_sse_event(
                 event_id,
                 "end",
                 {
@@ -141,6 +168,7 @@ class StreamingService:
                 },
             )
         # Add other stream modes as needed
+        return None
 
     async def signal_run_cancelled(self, run_id: str):
         """Signal that a run was cancelled"""
@@ -227,14 +255,15 @@ class StreamingService:
     ) -> AsyncIterator[str]:
         """Stream live events from broker"""
         run_id = run.run_id
-        broker = broker_manager.get_or_create_broker(run_id)
 
-        # If run finished and broker is done, nothing to stream
-        if (
-            run.status in ["completed", "failed", "cancelled", "interrupted"]
-            and broker.is_finished()
-        ):
-            return
+        # If run finished and its broker is done (or already dropped), nothing
+        # to stream; don't recreate a broker nobody will ever finish
+        if run.status in ["completed", "failed", "cancelled", "interrupted"]:
+            broker = broker_manager.get_broker(run_id)
+            if broker is None or broker.is_finished():
+                return
+
+        broker = broker_manager.get_or_create_broker(run_id)
 
         # Stream live events
         if broker:
@@ -307,6 +336,20 @@ class StreamingService:
         """Clean up streaming resources for a run"""
         broker_manager.cleanup_broker(run_id)
 
+    async def drop_buffer(self, run_id: str) -> None:
+        """Release the live broker and event counter kept for a finished run"""
+        self._drop_buffer(run_id)
+
+    def schedule_buffer_drop(
+        self, run_id: str, delay: float = BUFFER_RETENTION_SECONDS
+    ) -> None:
+        """Drop a run's buffer after ``delay`` so late reconnects can still drain it"""
+        asyncio.get_running_loop().call_later(delay, self._drop_buffer, run_id)
+
+    def _drop_buffer(self, run_id: str) -> None:
+        broker_manager.remove_broker(run_id)
+        self.event_counters.pop(run_id, None)
+
     def _stored_event_to_sse(self, run_id: str, ev) -> str | None:
         """Convert stored event object to SSE string"""
         return self.event_converter.convert_stored_to_sse(ev, run_id)
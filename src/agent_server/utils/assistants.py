@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
+from functools import lru_cache
 from uuid import uuid5
 
 from ..constants import ASSISTANT_NAMESPACE_UUID
 
 
+@lru_cache(maxsize=1024)
+def _graph_assistant_id(graph_id: str) -> str:
+    """Derive the deterministic assistant UUID for a graph id."""
+    return str(uuid5(ASSISTANT_NAMESPACE_UUID, graph_id))
+
+
 def resolve_assistant_id(
     requested_id: str, available_graphs: Mapping[str, object]
 ) -> str:
@@ -23,7 +30,7 @@ def resolve_assistant_id(
         A string assistant_id suitable for DB lookups and FK references.
     """
     return (
-        str(uuid5(ASSISTANT_NAMESPACE_UUID, requested_id))
+        _graph_assistant_id(requested_id)
         if requested_id in available_graphs
         else requested_id
     )
@@ -1,6 +1,8 @@
 """Integration tests for runs CRUD operations"""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
 
 from tests.fixtures.clients import create_test_app, make_client
 from tests.fixtures.database import DummySessionBase
@@ -104,6 +106,11 @@ def _run_row(
     return run
 
 
+def _mapping_row(run):
+    """Wrap a mock run ORM object as a column row"""
+    return Mock(_mapping={c.name: getattr(run, c.name) for c in run.__table__.columns})
+
+
 class TestCreateRun:
     """Test POST /threads/{thread_id}/runs"""
 
@@ -124,6 +131,157 @@ class TestCreateRun:
         # Should get validation error (422) for missing input/command
         assert resp.status_code == 422
 
+    def test_create_run_commits_once(self):
+        """Thread update and run insert share a single commit"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        assistant = _assistant_row()
+        sessions = []
+
+        class Session(DummySessionBase):
+            def __init__(self):
+                self.commits = 0
+                self.added = []
+                sessions.append(self)
+
+            async def scalar(self, stmt):
+                if getattr(stmt, "is_update", False):
+                    return "test-thread-123"
+                return assistant
+
+            def get_bind(self):
+                return Mock(dialect=Mock())
+
+            def add(self, obj):
+                self.added.append(obj)
+
+            async def commit(self):
+                self.commits += 1
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        service = Mock()
+        service.list_graphs.return_value = {"test-graph": "./graph.py:graph"}
+        with (
+            patch("agent_server.api.runs.get_langgraph_service", return_value=service),
+            patch("agent_server.api.runs.execute_run_async", new=AsyncMock()),
+        ):
+            resp = client.post(
+                "/threads/test-thread-123/runs",
+                json={"assistant_id": "test-assistant-123", "input": {"q": "hi"}},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "pending"
+        assert sessions[0].commits == 1
+        assert len(sessions[0].added) == 1
+        run = sessions[0].added[0]
+        assert run.created_at == run.updated_at
+
+    def test_create_run_thread_not_found(self):
+        """Missing thread is reported before anything is committed"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        assistant = _assistant_row()
+        sessions = []
+
+        class Session(DummySessionBase):
+            def __init__(self):
+                self.commits = 0
+                sessions.append(self)
+
+            async def scalar(self, stmt):
+                if getattr(stmt, "is_update", False):
+                    return None
+                return assistant
+
+            def get_bind(self):
+                return Mock(dialect=Mock())
+
+            async def commit(self):
+                self.commits += 1
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        service = Mock()
+        service.list_graphs.return_value = {"test-graph": "./graph.py:graph"}
+        with patch("agent_server.api.runs.get_langgraph_service", return_value=service):
+            resp = client.post(
+                "/threads/test-thread-123/runs",
+                json={"assistant_id": "test-assistant-123", "input": {"q": "hi"}},
+            )
+
+        assert resp.status_code == 404
+        assert sessions[0].commits == 0
+
+    def test_create_run_resume_single_lookup(self):
+        """Resume validation and assistant lookup share one query"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        assistant = _assistant_row()
+        sessions = []
+
+        class Session(DummySessionBase):
+            def __init__(self):
+                self.executes = 0
+                sessions.append(self)
+
+            async def execute(self, _stmt):
+                self.executes += 1
+                result = Mock()
+                result.first.return_value = (assistant, "busy")
+                return result
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        service = Mock()
+        service.list_graphs.return_value = {"test-graph": "./graph.py:graph"}
+        with patch("agent_server.api.runs.get_langgraph_service", return_value=service):
+            resp = client.post(
+                "/threads/test-thread-123/runs",
+                json={"assistant_id": "test-assistant-123", "command": {"resume": 1}},
+            )
+
+        assert resp.status_code == 400
+        assert "not in interrupted state" in resp.json()["detail"]
+        assert sessions[0].executes == 1
+        service.list_graphs.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ("row", "detail"),
+        [
+            # Missing thread is reported before the missing assistant
+            (None, "Thread 'test-thread-123' not found"),
+            ((None, "interrupted"), "Assistant 'missing-assistant' not found"),
+        ],
+    )
+    def test_create_run_resume_error_precedence(self, row, detail):
+        """Resume checks the thread before the assistant"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        class Session(DummySessionBase):
+            async def execute(self, _stmt):
+                result = Mock()
+                result.first.return_value = row
+                return result
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        service = Mock()
+        service.list_graphs.return_value = {"test-graph": "./graph.py:graph"}
+        with patch("agent_server.api.runs.get_langgraph_service", return_value=service):
+            resp = client.post(
+                "/threads/test-thread-123/runs",
+                json={"assistant_id": "missing-assistant", "command": {"resume": 1}},
+            )
+
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == detail
+
 
 class TestGetRun:
     """Test GET /threads/{thread_id}/runs/{run_id}"""
@@ -179,12 +337,8 @@ class TestListRuns:
         ]
 
         class Session(DummySessionBase):
-            async def scalars(self, _stmt):
-                class Result:
-                    def all(self):
-                        return runs
-
-                return Result()
+            async def execute(self, _stmt):
+                return [_mapping_row(r) for r in runs]
 
         override_session_dependency(app, Session)
         client = make_client(app)
@@ -202,14 +356,10 @@ class TestListRuns:
         app = create_test_app(include_runs=True, include_threads=False)
 
         class Session(DummySessionBase):
-            async def scalars(self, _stmt):
-                class Result:
-                    def all(self):
-                        return []
-
-                return Result()
+            async def execute(self, _stmt):
+                return []
 
-        override_session_dependency(app, BasicSession)
+        override_session_dependency(app, Session)
         client = make_client(app)
 
         resp = client.get("/threads/test-thread-123/runs")
@@ -225,14 +375,10 @@ class TestListRuns:
         runs = [_run_row(f"run-{i}") for i in range(5)]
 
         class Session(DummySessionBase):
-            async def scalars(self, _stmt):
-                class Result:
-                    def all(self):
-                        return runs[:2]  # Simulate limit
-
-                return Result()
+            async def execute(self, _stmt):
+                return [_mapping_row(r) for r in runs[:2]]
 
-        override_session_dependency(app, BasicSession)
+        override_session_dependency(app, Session)
         client = make_client(app)
 
         resp = client.get("/threads/test-thread-123/runs?limit=2")
@@ -248,14 +394,10 @@ class TestListRuns:
         runs = [_run_row(f"run-{i}") for i in range(10)]
 
         class Session(DummySessionBase):
-            async def scalars(self, _stmt):
-                class Result:
-                    def all(self):
-                        return runs[5:]  # Simulate offset
-
-                return Result()
+            async def execute(self, _stmt):
+                return [_mapping_row(r) for r in runs[5:]]
 
-        override_session_dependency(app, BasicSession)
+        override_session_dependency(app, Session)
         client = make_client(app)
 
         resp = client.get("/threads/test-thread-123/runs?offset=5")
@@ -285,6 +427,57 @@ class TestUpdateRun:
 
         assert resp.status_code == 422
 
+    def test_update_run_cancel_returns_updated_row(self):
+        """Cancellation is a single scoped UPDATE ... RETURNING"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        run = _run_row(status="running")
+        cancelled = _run_row(status="cancelled")
+        statements = []
+
+        class Session(DummySessionBase):
+            async def scalar(self, stmt):
+                statements.append(stmt)
+                return cancelled if getattr(stmt, "is_update", False) else run
+
+            async def commit(self):
+                pass
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        with patch("agent_server.api.runs.streaming_service") as mock_streaming:
+            mock_streaming.cancel_run = AsyncMock()
+            mock_streaming.drop_buffer = AsyncMock()
+
+            resp = client.patch(
+                "/threads/test-thread-123/runs/test-run-123",
+                json={"run_id": "test-run-123", "status": "cancelled"},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "cancelled"
+        assert len(statements) == 1
+        assert statements[0].is_update
+
+    def test_update_run_not_found_does_not_signal(self):
+        """Unknown or foreign runs are rejected before any signal is sent"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        override_session_dependency(app, BasicSession)
+        client = make_client(app)
+
+        with patch("agent_server.api.runs.streaming_service") as mock_streaming:
+            mock_streaming.cancel_run = AsyncMock()
+
+            resp = client.patch(
+                "/threads/test-thread-123/runs/other-run",
+                json={"run_id": "other-run", "status": "cancelled"},
+            )
+
+        assert resp.status_code == 404
+        mock_streaming.cancel_run.assert_not_awaited()
+
 
 class TestCancelRun:
     """Test POST /threads/{thread_id}/runs/{run_id}/cancel"""
@@ -325,10 +518,13 @@ class TestCancelRun:
 
         with patch("agent_server.api.runs.streaming_service") as mock_streaming:
             mock_streaming.cancel_run = AsyncMock()
+            mock_streaming.drop_buffer = AsyncMock()
 
             resp = client.post("/threads/test-thread-123/runs/test-run-123/cancel")
 
             assert resp.status_code == 200
+            # No task is running, so the run's buffer is released right away
+            mock_streaming.drop_buffer.assert_awaited_once_with("test-run-123")
 
 
 class TestDeleteRun:
@@ -372,14 +568,12 @@ class TestDeleteRun:
         """Test successfully deleting a completed run"""
         app = create_test_app(include_runs=True, include_threads=False)
 
-        run = _run_row(status="completed")
+        statements = []
 
         class Session(DummySessionBase):
-            async def scalar(self, _stmt):
-                return run
-
-            async def execute(self, _stmt):
-                pass
+            async def scalar(self, stmt):
+                statements.append(stmt)
+                return "test-run-123"
 
             async def commit(self):
                 pass
@@ -390,6 +584,105 @@ class TestDeleteRun:
         resp = client.delete("/threads/test-thread-123/runs/test-run-123")
 
         assert resp.status_code == 204
+        # A settled run is deleted with a single DELETE ... RETURNING
+        assert len(statements) == 1
+        assert statements[0].is_delete
+
+    def test_force_delete_other_users_run_not_found(self):
+        """Test that a force delete checks ownership before deleting"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        run = _run_row(status="completed", user_id="someone-else")
+        statements = []
+
+        class Session(DummySessionBase):
+            async def get(self, _model, _pk, **_kwargs):
+                return run
+
+            async def scalar(self, stmt):
+                statements.append(stmt)
+                return "test-run-123"
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        resp = client.delete("/threads/test-thread-123/runs/test-run-123?force=1")
+
+        assert resp.status_code == 404
+        assert statements == []
+
+    def test_force_delete_cancels_after_commit(self):
+        """Test that an active run is cancelled only once its row lock is released"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        run = _run_row(status="running")
+        calls = []
+
+        class Session(DummySessionBase):
+            async def get(self, _model, _pk, **_kwargs):
+                return run
+
+            async def scalar(self, _stmt):
+                calls.append("delete")
+                return "test-run-123"
+
+            async def commit(self):
+                calls.append("commit")
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        with patch("agent_server.api.runs.streaming_service") as mock_streaming:
+            mock_streaming.cancel_run = AsyncMock(
+                side_effect=lambda _run_id: calls.append("cancel")
+            )
+
+            resp = client.delete("/threads/test-thread-123/runs/test-run-123?force=1")
+
+        assert resp.status_code == 204
+        assert calls == ["delete", "commit", "cancel"]
+
+    def test_force_delete_locked_run_returns_conflict(self):
+        """Test that a run locked by a concurrent force delete is not deleted twice"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        lock_options = []
+        statements = []
+
+        class Session(DummySessionBase):
+            async def get(self, _model, _pk, with_for_update=None):
+                # SKIP LOCKED returns nothing while another request holds the row
+                lock_options.append(with_for_update)
+                return None
+
+            async def scalar(self, stmt):
+                statements.append(stmt)
+                return "running"
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        resp = client.delete("/threads/test-thread-123/runs/test-run-123?force=1")
+
+        assert resp.status_code == 409
+        assert lock_options == [{"skip_locked": True}]
+        assert not any(getattr(s, "is_delete", False) for s in statements)
+
+    def test_delete_run_active_returns_conflict(self):
+        """Test that an active run is reported as a conflict, not as missing"""
+        app = create_test_app(include_runs=True, include_threads=False)
+
+        class Session(DummySessionBase):
+            async def scalar(self, stmt):
+                # Active runs are excluded from the DELETE; the status probe sees it
+                return None if getattr(stmt, "is_delete", False) else "running"
+
+        override_session_dependency(app, Session)
+        client = make_client(app)
+
+        resp = client.delete("/threads/test-thread-123/runs/test-run-123")
+
+        assert resp.status_code == 409
 
 
 class TestJoinRun:
@@ -486,14 +779,10 @@ class TestRunStatuses:
         ]
 
         class Session(DummySessionBase):
-            async def scalars(self, _stmt):
-                class Result:
-                    def all(self):
-                        return runs
-
-                return Result()
+            async def execute(self, _stmt):
+                return [_mapping_row(r) for r in runs]
 
-        override_session_dependency(app, BasicSession)
+        override_session_dependency(app, Session)
         client = make_client(app)
 
         resp = client.get("/threads/test-thread-123/runs?status=completed")
@@ -0,0 +1,350 @@
+"""Unit tests for run endpoint helpers"""
+
+import asyncio
+import contextlib
+import functools
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from agent_server.api.runs import (
+    _discard_run,
+    _finish_shielded,
+    _json_merge,
+    _ReplayBuffer,
+    _should_skip_event,
+    _wait_cancelled,
+    _write_final_status,
+    active_runs,
+    finalize_run_status,
+    join_run,
+    map_command_to_langgraph,
+    register_run,
+    set_thread_status,
+    update_run_status,
+)
+from agent_server.core.orm import Thread as ThreadORM
+from agent_server.models import CommandIn
+
+
+def _session(dialect_name: str) -> Mock:
+    session = Mock()
+    session.get_bind.return_value.dialect.name = dialect_name
+    return session
+
+
+def _compile_merge(dialect_name: str, dialect) -> str:
+    stmt = update(ThreadORM).values(
+        metadata_json=_json_merge(
+            _session(dialect_name), ThreadORM.metadata_json, {"graph_id": "agent"}
+        )
+    )
+    return str(stmt.compile(dialect=dialect))
+
+
+class TestJsonMerge:
+    """Test dialect-aware JSON merge expressions"""
+
+    def test_postgresql_uses_jsonb_concat(self):
+        sql = _compile_merge("postgresql", postgresql.dialect())
+
+        assert "||" in sql
+        assert "coalesce(thread.metadata_json" in sql
+
+    def test_other_dialects_use_json_patch(self):
+        sql = _compile_merge("sqlite", sqlite.dialect())
+
+        assert "json_patch(coalesce(thread.metadata_json" in sql
+
+
+class TestDiscardRun:
+    """Test release of finished run tasks"""
+
+    async def test_finished_task_is_removed(self):
+        task = asyncio.create_task(asyncio.sleep(0))
+        active_runs["run-1"] = task
+        task.add_done_callback(functools.partial(_discard_run, "run-1"))
+
+        with patch("agent_server.api.runs.broker_manager") as manager:
+            await task
+            await asyncio.sleep(0)
+
+        assert "run-1" not in active_runs
+        manager.cleanup_broker.assert_called_once_with("run-1")
+
+    async def test_task_cancelled_before_start_is_removed(self):
+        task = asyncio.create_task(asyncio.sleep(10))
+        active_runs["run-2"] = task
+        task.add_done_callback(functools.partial(_discard_run, "run-2"))
+        task.cancel()
+
+        with patch("agent_server.api.runs.broker_manager"):
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        assert "run-2" not in active_runs
+
+    async def test_registered_run_is_tracked_until_done(self):
+        with patch("agent_server.api.runs.broker_manager"):
+            task = register_run("run-7", asyncio.sleep(0))
+            assert active_runs["run-7"] is task
+            assert task.get_name() == "run-run-7"
+
+            await task
+            await asyncio.sleep(0)
+
+        assert "run-7" not in active_runs
+
+    def test_replacement_task_is_kept(self):
+        current = Mock()
+        active_runs["run-3"] = current
+
+        with patch("agent_server.api.runs.broker_manager"):
+            _discard_run("run-3", Mock())
+
+        assert active_runs.pop("run-3") is current
+
+
+class TestJoinRun:
+    """Test that joining observes a run without cancelling it"""
+
+    async def test_timeout_leaves_run_running(self):
+        task = asyncio.create_task(asyncio.sleep(10))
+        active_runs["run-4"] = task
+        session = Mock()
+        session.scalar = AsyncMock(return_value=Mock(status="running", output=None))
+        session.refresh = AsyncMock()
+
+        try:
+            with patch("agent_server.api.runs.JOIN_TIMEOUT", 0.01):
+                output = await join_run(
+                    "thread-1", "run-4", user=Mock(identity="u"), session=session
+                )
+
+            assert output == {}
+            assert not task.done()
+            session.refresh.assert_awaited_once()
+        finally:
+            active_runs.pop("run-4", None)
+            task.cancel()
+
+
+class TestReplayBuffer:
+    """Test batched replay event storage"""
+
+    async def test_deadline_flushes_without_further_events(self):
+        replay = _ReplayBuffer("run-8")
+
+        with (
+            patch("agent_server.api.runs.streaming_service") as streaming,
+            patch("agent_server.api.runs.EVENT_STORE_FLUSH_INTERVAL", 0.01),
+        ):
+            streaming.store_events_from_raw = AsyncMock()
+            await replay.add("run-8_event_1", ("values", {"n": 1}))
+            streaming.store_events_from_raw.assert_not_awaited()
+
+            # No further event arrives, e.g. a long LLM call is in progress
+            await asyncio.sleep(0.05)
+
+            streaming.store_events_from_raw.assert_awaited_once_with(
+                "run-8",
+                [("run-8_event_1", ("values", {"n": 1}))],
+                only_interrupt_updates=False,
+            )
+
+    async def test_close_writes_remaining_events_in_order(self):
+        replay = _ReplayBuffer("run-9")
+        batches = []
+
+        with (
+            patch("agent_server.api.runs.streaming_service") as streaming,
+            patch("agent_server.api.runs.EVENT_STORE_BATCH_SIZE", 2),
+        ):
+            streaming.store_events_from_raw = AsyncMock(
+                side_effect=lambda _run_id, batch, **_kw: batches.append(batch)
+            )
+            for n in range(3):
+                await replay.add(f"run-9_event_{n}", ("values", n))
+            await replay.close()
+
+        assert [[event_id for event_id, _ in batch] for batch in batches] == [
+            ["run-9_event_0", "run-9_event_1"],
+            ["run-9_event_2"],
+        ]
+        assert replay._timer is None
+
+
+class TestWaitCancelled:
+    """Test the bounded wait on a cancelled run's task"""
+
+    async def test_stuck_task_does_not_block(self):
+        release = asyncio.Event()
+
+        async def ignores_cancel():
+            while not release.is_set():
+                with contextlib.suppress(asyncio.CancelledError):
+                    await release.wait()
+
+        task = asyncio.create_task(ignores_cancel())
+        await asyncio.sleep(0)
+        task.cancel()
+
+        try:
+            with patch("agent_server.api.runs.CANCEL_TIMEOUT", 0.01):
+                await _wait_cancelled("run-6", task)
+            assert not task.done()
+        finally:
+            release.set()
+            await task
+
+    async def test_failed_task_is_not_raised(self):
+        async def boom():
+            raise RuntimeError("boom")
+
+        task = asyncio.create_task(boom())
+
+        await _wait_cancelled("run-7", task)
+
+        assert isinstance(task.exception(), RuntimeError)
+
+
+class TestTerminalStatusTransaction:
+    """Test that run and thread status share the caller's transaction"""
+
+    async def test_session_writes_leave_commit_to_caller(self):
+        session = Mock()
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+
+        with patch("agent_server.api.runs.run_status_batcher") as batcher:
+            await update_run_status(
+                "run-5", "completed", output={"ok": True}, session=session
+            )
+            await set_thread_status(session, "thread-1", "idle")
+
+        assert session.execute.await_count == 2
+        session.commit.assert_not_awaited()
+        batcher.submit.assert_not_called()
+        # Run and thread are stamped by the same (database) clock
+        for call in session.execute.await_args_list:
+            compiled = str(call.args[0].compile(dialect=postgresql.dialect()))
+            assert "updated_at=now()" in compiled
+
+    async def test_empty_output_skips_serializer(self):
+        session = Mock()
+        session.execute = AsyncMock()
+
+        with patch("agent_server.api.runs.serializer") as serializer:
+            await update_run_status("run-8", "failed", output={}, session=session)
+
+        serializer.serialize.assert_not_called()
+
+    async def test_updated_at_is_set_by_database(self):
+        session = Mock()
+        session.execute = AsyncMock()
+
+        await update_run_status("run-9", "completed", session=session)
+
+        stmt = session.execute.await_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "updated_at=now()" in sql
+
+    async def test_finalize_commits_once(self):
+        session = Mock()
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+
+        await finalize_run_status(session, "run-6", "thread-1", "cancelled", output={})
+
+        assert session.execute.await_count == 2
+        session.commit.assert_awaited_once()
+
+    async def test_final_write_session_is_closed_on_failure(self):
+        session = Mock()
+        session.execute = AsyncMock(side_effect=RuntimeError("db down"))
+        maker = Mock()
+        maker.return_value.__aenter__ = AsyncMock(return_value=session)
+        maker.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch("agent_server.api.runs._get_session_maker", return_value=maker),
+            pytest.raises(RuntimeError, match="db down"),
+        ):
+            await _write_final_status(None, "run-6", "thread-1", "failed")
+
+        maker.return_value.__aexit__.assert_awaited_once()
+
+    async def test_shielded_write_outlives_second_cancel(self):
+        release = asyncio.Event()
+        finished = []
+
+        async def write():
+            await release.wait()
+            finished.append(True)
+
+        task = asyncio.create_task(_finish_shielded(write()))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.sleep(0)
+
+        # The caller stays pending until the write settles
+        assert not task.done()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert finished == [True]
+
+
+class TestMapCommand:
+    """Test conversion of API commands to LangGraph commands"""
+
+    def test_single_goto_and_send(self):
+        cmd = CommandIn.model_validate(
+            {"goto": {"node": "tools", "input": {"x": 1}}, "resume": "ok"}
+        )
+
+        command = map_command_to_langgraph(cmd)
+
+        assert len(command.goto) == 1
+        assert command.goto[0].node == "tools"
+        assert command.goto[0].arg == {"x": 1}
+        assert command.resume == "ok"
+
+    def test_update_pairs_become_tuples(self):
+        cmd = CommandIn.model_validate(
+            {"update": [["messages", []]], "goto": ["a", "b"]}
+        )
+
+        command = map_command_to_langgraph(cmd)
+
+        assert command.update == [("messages", [])]
+        assert command.goto == ["a", "b"]
+
+    def test_empty_goto_is_none(self):
+        command = map_command_to_langgraph(CommandIn(goto=[], update={"k": 1}))
+
+        assert command.goto is None
+        assert command.update == {"k": 1}
+
+
+class TestShouldSkipEvent:
+    """Test langsmith:nostream filtering"""
+
+    def test_nostream_message_is_skipped(self):
+        event = ("messages", ("chunk", {"tags": ["langsmith:nostream"]}))
+
+        assert _should_skip_event(event) is True
+
+    def test_subgraph_message_is_skipped(self):
+        event = (("child:1",), "messages", ("chunk", {"tags": ["langsmith:nostream"]}))
+
+        assert _should_skip_event(event) is True
+
+    def test_other_events_pass_through(self):
+        assert _should_skip_event(("messages", ("chunk", {"tags": ["x"]}))) is False
+        assert _should_skip_event(("values", {"messages": []})) is False
+        assert _should_skip_event({"messages": []}) is False
+        assert _should_skip_event(("updates",)) is False
+        assert _should_skip_event(None) is False
@@ -0,0 +1,415 @@
+"""Unit tests for the root auth.py module"""
+
+import importlib.util
+import logging
+import os
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import Mock, patch
+
+import pytest
+from langgraph_sdk import Auth
+
+AUTH_PATH = Path(__file__).parents[2] / "auth.py"
+
+
+def load_auth_module(auth_type: str, **env: str) -> ModuleType:
+    """Import a fresh copy of auth.py with the given AUTH_TYPE"""
+    spec = importlib.util.spec_from_file_location("auth_under_test", AUTH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(os.environ, {"AUTH_TYPE": auth_type, **env}):
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def custom_auth() -> ModuleType:
+    return load_auth_module("custom", AUTH_DEV_TOKEN="dev-token")
+
+
+class TestConstantUsers:
+    """Test the shared read-only constant users"""
+
+    def test_getitem(self, custom_auth):
+        user = custom_auth.DEV_USER
+
+        assert user["identity"] == "dev-user"
+        assert user["permissions"] == ("admin",)
+        with pytest.raises(KeyError):
+            user["missing"]
+
+    def test_is_read_only(self, custom_auth):
+        with pytest.raises(TypeError):
+            custom_auth.ANONYMOUS_USER["identity"] = "someone-else"
+
+
+class TestTokenCache:
+    """Test the verified token cache"""
+
+    def test_get_missing(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=10, ttl=60)
+        assert cache.get("token") is None
+
+    def test_set_and_get(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=10, ttl=60)
+        user = {"identity": "user-1"}
+        cache.set("token", user)
+        assert cache.get("token") is user
+
+    def test_keys_are_digests(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=10, ttl=60)
+        cache.set("secret-token", {"identity": "user-1"})
+        assert all(b"secret-token" not in key for key in cache._entries)
+
+    def test_entry_expires(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=10, ttl=60)
+        cache.set("token", {"identity": "user-1"})
+        with patch.object(custom_auth.time, "monotonic", return_value=1e12):
+            assert cache.get("token") is None
+        assert not cache._entries
+
+    def test_token_exp_bounds_ttl(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=10, ttl=60)
+        cache.set("token", {"identity": "user-1"}, exp=custom_auth.time.time() - 1)
+        assert cache.get("token") is None
+
+    def test_evicts_least_recently_used(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=2, ttl=60)
+        cache.set("a", {"identity": "a"})
+        cache.set("b", {"identity": "b"})
+        cache.get("a")
+        cache.set("c", {"identity": "c"})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_zero_ttl_disables_cache(self, custom_auth):
+        cache = custom_auth.TokenCache(maxsize=10, ttl=0)
+        cache.set("token", {"identity": "user-1"})
+        assert cache.get("token") is None
+
+
+class TestRejectionLog:
+    """Test rate-limited rejection logging"""
+
+    def test_first_hit_logs_warning(self, custom_auth, caplog):
+        log = custom_auth.RejectionLog("Bad thing", interval=60)
+
+        with caplog.at_level(logging.WARNING, logger=custom_auth.logger.name):
+            log.hit()
+
+        assert len(caplog.records) == 1
+        assert (
+            "Bad thing (1 since the previous report)" in caplog.records[0].getMessage()
+        )
+
+    def test_hits_within_interval_are_aggregated(self, custom_auth, caplog):
+        log = custom_auth.RejectionLog("Bad thing", interval=60)
+
+        with caplog.at_level(logging.WARNING, logger=custom_auth.logger.name):
+            for _ in range(5):
+                log.hit()
+            assert len(caplog.records) == 1
+
+            with patch.object(custom_auth.time, "monotonic", return_value=1e12):
+                log.hit()
+
+        assert len(caplog.records) == 2
+        assert (
+            "Bad thing (5 since the previous report)" in caplog.records[1].getMessage()
+        )
+
+
+class TestCustomAuthenticate:
+    """Test the custom authenticate handler"""
+
+    @pytest.mark.asyncio
+    async def test_cached_token_skips_verification(self, custom_auth):
+        user = {"identity": "user-1", "is_authenticated": True}
+        custom_auth._token_cache.set("good-token", user)
+
+        result = await custom_auth.authenticate({"authorization": "Bearer good-token"})
+
+        assert result is user
+
+    @pytest.mark.asyncio
+    async def test_verified_token_is_cached(self, custom_auth):
+        user = {"identity": "user-1", "is_authenticated": True}
+        calls = []
+
+        async def verify_token(token):
+            calls.append(token)
+            return user
+
+        custom_auth.verify_token = verify_token
+        headers = {"authorization": "Bearer good-token"}
+
+        assert await custom_auth.authenticate(headers) is user
+        assert await custom_auth.authenticate(headers) is user
+        assert calls == ["good-token"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_not_cached(self, custom_auth):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate({"authorization": "Bearer bad-token"})
+
+        assert exc_info.value.status_code == 401
+        assert custom_auth._token_cache.get("bad-token") is None
+
+    @pytest.mark.asyncio
+    async def test_missing_header(self, custom_auth):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate({})
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Authorization header required"
+
+    @pytest.mark.asyncio
+    async def test_rejections_do_not_share_state(self, custom_auth):
+        errors = []
+        for _ in range(2):
+            with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+                await custom_auth.authenticate({})
+            errors.append(exc_info.value)
+
+        assert errors[0] is not errors[1]
+        assert errors[1].__cause__ is None
+        assert errors[1].detail == custom_auth.MISSING_AUTH_DETAIL
+
+    @pytest.mark.asyncio
+    async def test_bytes_header(self, custom_auth):
+        result = await custom_auth.authenticate({b"authorization": b"Bearer dev-token"})
+
+        assert result["identity"] == "dev-user"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "authorization",
+        [
+            "Basic abc",
+            "Bearer",
+            "Bearer ",
+            "bearer dev-token",
+            "Bearer dev token",
+            "Bearer dev-token\t",
+        ],
+    )
+    async def test_invalid_format(self, custom_auth, authorization):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate({"authorization": authorization})
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail.startswith("Invalid authorization format")
+
+    @pytest.mark.asyncio
+    async def test_dev_token_returns_shared_user(self, custom_auth):
+        result = await custom_auth.authenticate({"authorization": "Bearer dev-token"})
+
+        assert result is custom_auth.DEV_USER
+        assert result["identity"] == "dev-user"
+
+    @pytest.mark.asyncio
+    async def test_custom_dev_token(self):
+        custom_auth = load_auth_module("custom", AUTH_DEV_TOKEN="local-secret")
+
+        result = await custom_auth.authenticate(
+            {"authorization": "Bearer local-secret"}
+        )
+
+        assert result is custom_auth.DEV_USER
+
+    @pytest.mark.asyncio
+    async def test_dev_token_off_by_default(self):
+        with patch.dict(os.environ):
+            os.environ.pop("AUTH_DEV_TOKEN", None)
+            custom_auth = load_auth_module("custom")
+
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate({"authorization": "Bearer dev-token"})
+
+        assert exc_info.value.detail == "Invalid authentication token"
+
+    @pytest.mark.asyncio
+    async def test_dev_token_disabled(self):
+        custom_auth = load_auth_module("custom", AUTH_DEV_TOKEN="")
+
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate({"authorization": "Bearer dev-token"})
+
+        assert exc_info.value.detail == "Invalid authentication token"
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_token_rejected(self, custom_auth):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate({"authorization": "Bearer dév-token"})
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail.startswith("Invalid authorization format")
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_bytes_token_rejected(self, custom_auth):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authenticate(
+                {b"authorization": "Bearer dév-token".encode()}
+            )
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail.startswith("Invalid authorization format")
+
+
+def make_ctx(identity: str | None, action: str = "create") -> Mock:
+    ctx = Mock()
+    ctx.user.identity = identity
+    ctx.resource = "threads"
+    ctx.action = action
+    return ctx
+
+
+class TestCustomAuthorize:
+    """Test the custom authorize handler"""
+
+    @pytest.mark.asyncio
+    async def test_write_stamps_owner_metadata(self, custom_auth):
+        value = {"metadata": {"foo": "bar"}}
+
+        result = await custom_auth.authorize(make_ctx("user-1", "create"), value)
+
+        assert result == {"owner": "user-1"}
+        assert value["metadata"] == {"foo": "bar", "owner": "user-1"}
+
+    @pytest.mark.asyncio
+    async def test_write_creates_metadata(self, custom_auth):
+        value = {"thread_id": "t-1"}
+
+        await custom_auth.authorize(make_ctx("user-1", "update"), value)
+
+        assert value["metadata"] == {"owner": "user-1"}
+
+    @pytest.mark.asyncio
+    async def test_empty_value_not_mutated(self, custom_auth):
+        value = {}
+
+        await custom_auth.authorize(make_ctx("user-1", "delete"), value)
+
+        assert value == {}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("action", ["read", "search"])
+    async def test_read_does_not_mutate_value(self, custom_auth, action):
+        value = {"thread_id": "t-1"}
+
+        result = await custom_auth.authorize(make_ctx("user-1", action), value)
+
+        assert result == {"owner": "user-1"}
+        assert value == {"thread_id": "t-1"}
+
+    @pytest.mark.asyncio
+    async def test_owner_filter_reused_per_user(self, custom_auth):
+        first = await custom_auth.authorize(make_ctx("user-1", "read"), {})
+        second = await custom_auth.authorize(make_ctx("user-1", "read"), {})
+
+        assert first is second
+        with pytest.raises(TypeError):
+            first["owner"] = "someone-else"
+
+    @pytest.mark.asyncio
+    async def test_missing_identity(self, custom_auth):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authorize(make_ctx(None), {})
+
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_missing_user(self, custom_auth):
+        ctx = Mock(spec=["action", "resource"])
+
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authorize(ctx, {})
+
+        assert exc_info.value.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_error_traceback_is_sampled(self, custom_auth, caplog):
+        ctx = Mock(spec=["action", "resource"])
+
+        with caplog.at_level(logging.ERROR, logger=custom_auth.logger.name):
+            for _ in range(3):
+                with pytest.raises(Auth.exceptions.HTTPException):
+                    await custom_auth.authorize(ctx, {})
+
+        assert len(caplog.records) == 3
+        assert [bool(r.exc_info) for r in caplog.records] == [
+            True,
+            False,
+            False,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_null_metadata_replaced(self, custom_auth):
+        value = {"metadata": None}
+
+        await custom_auth.authorize(make_ctx("user-1", "create"), value)
+
+        assert value["metadata"] == {"owner": "user-1"}
+
+    @pytest.mark.asyncio
+    async def test_invalid_metadata(self, custom_auth):
+        with pytest.raises(Auth.exceptions.HTTPException) as exc_info:
+            await custom_auth.authorize(
+                make_ctx("user-1", "create"), {"metadata": ["not", "a", "dict"]}
+            )
+
+        assert exc_info.value.status_code == 400
+
+
+class TestNoopAuth:
+    """Test the noop authentication handlers"""
+
+    def test_authenticate_returns_anonymous(self):
+        noop_auth = load_auth_module("noop")
+
+        result = noop_auth.authenticate({})
+
+        assert result is noop_auth.ANONYMOUS_USER
+        assert result["identity"] == "anonymous"
+
+
+class TestHandlerSelection:
+    """Test AUTH_TYPE handler dispatch"""
+
+    @pytest.mark.parametrize("auth_type", ["noop", "custom", "NOOP"])
+    def test_selected_handlers_registered(self, auth_type):
+        module = load_auth_module(auth_type)
+
+        authenticate, authorize = module.HANDLERS[auth_type.lower()]
+        assert module.auth._authenticate_handler is authenticate
+        assert module.auth._global_handlers == [authorize]
+
+    def test_custom_registers_read_handlers(self, custom_auth):
+        handlers = custom_auth.auth._handlers
+
+        for resource, actions in custom_auth.READ_ROUTES.items():
+            for action in actions:
+                assert handlers[(resource, action)] == [
+                    custom_auth.custom_authorize_read
+                ]
+
+    def test_noop_registers_no_read_handlers(self):
+        noop_auth = load_auth_module("noop")
+
+        assert noop_auth.auth._handlers == {}
+
+    @pytest.mark.asyncio
+    async def test_read_handler_returns_filter_without_mutation(self, custom_auth):
+        value = {"metadata": {"foo": "bar"}}
+
+        result = await custom_auth.custom_authorize_read(
+            make_ctx("user-1", "create"), value
+        )
+
+        assert result == {"owner": "user-1"}
+        assert value == {"metadata": {"foo": "bar"}}
+
+    def test_unknown_auth_type(self):
+        with pytest.raises(ValueError, match="Unknown AUTH_TYPE"):
+            load_auth_module("unknown")
@@ -1,7 +1,9 @@
 """Unit tests for auth middleware"""
 
+import logging
 import os
 from pathlib import Path
+from types import MappingProxyType
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -245,6 +247,46 @@ class TestLangGraphAuthBackend:
         assert user.identity == "user-123"
         assert user.display_name == "Test User"
 
+    @pytest.mark.asyncio
+    async def test_authenticate_sync_handler(self):
+        """Test authentication with a plain (non-async) handler"""
+        mock_auth_instance = Mock()
+        mock_auth_instance._authenticate_handler = Mock(
+            return_value={"identity": "anonymous", "is_authenticated": True}
+        )
+
+        backend = LangGraphAuthBackend()
+        backend.auth_instance = mock_auth_instance
+
+        mock_conn = Mock(spec=HTTPConnection)
+        mock_conn.headers = {}
+
+        credentials, user = await backend.authenticate(mock_conn)
+
+        assert isinstance(credentials, AuthCredentials)
+        assert user.identity == "anonymous"
+
+    @pytest.mark.asyncio
+    async def test_authenticate_mapping_user(self):
+        """Test authentication with a read-only Mapping returned by the handler"""
+        mock_auth_instance = Mock()
+        mock_auth_instance._authenticate_handler = AsyncMock(
+            return_value=MappingProxyType(
+                {"identity": "user-123", "permissions": ["read"]}
+            )
+        )
+
+        backend = LangGraphAuthBackend()
+        backend.auth_instance = mock_auth_instance
+
+        mock_conn = Mock(spec=HTTPConnection)
+        mock_conn.headers = {}
+
+        credentials, user = await backend.authenticate(mock_conn)
+
+        assert credentials.scopes == ["read"]
+        assert user.to_dict() == {"identity": "user-123", "permissions": ["read"]}
+
     @pytest.mark.asyncio
     async def test_authenticate_success_string_permissions(self):
         """Test authentication with string permissions"""
@@ -296,7 +338,7 @@ class TestLangGraphAuthBackend:
             await backend.authenticate(mock_conn)
 
     @pytest.mark.asyncio
-    async def test_authenticate_http_exception(self):
+    async def test_authenticate_http_exception(self, caplog):
         """Test authentication with HTTP exception"""
         mock_auth_instance = Mock()
 
@@ -317,9 +359,15 @@ class TestLangGraphAuthBackend:
             mock_conn = Mock(spec=HTTPConnection)
             mock_conn.headers = {"authorization": b"Bearer token123"}
 
-            with pytest.raises(AuthenticationError, match="Invalid token"):
+            with (
+                caplog.at_level(logging.WARNING),
+                pytest.raises(AuthenticationError, match="Invalid token"),
+            ):
                 await backend.authenticate(mock_conn)
 
+        # Rejections are reported by the handler's rate-limited log only
+        assert caplog.records == []
+
     @pytest.mark.asyncio
     async def test_authenticate_headers_conversion(self):
         """Test header conversion for different types"""
@@ -0,0 +1,24 @@
+"""Unit tests for the shared session maker"""
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.agent_server.core import orm
+
+
+class TestInitSessionMaker:
+    """Test binding the session maker at startup"""
+
+    def test_rebinds_to_new_engine(self):
+        """Test that a re-created engine replaces the cached maker"""
+        previous = orm.async_session_maker
+        try:
+            first = create_async_engine("postgresql+asyncpg://u:p@localhost/a")
+            second = create_async_engine("postgresql+asyncpg://u:p@localhost/b")
+
+            orm.init_session_maker(first)
+            maker = orm.init_session_maker(second)
+
+            assert orm._get_session_maker() is maker
+            assert maker.kw["bind"] is second
+        finally:
+            orm.async_session_maker = previous
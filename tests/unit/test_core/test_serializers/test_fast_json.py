@@ -0,0 +1,30 @@
+"""Unit tests for the shared orjson-backed JSON encoder"""
+
+import json
+
+from src.agent_server.core.serializers.fast_json import json_dumps
+
+
+class TestJsonDumps:
+    """Test the encoder used for JSON columns and SSE payloads"""
+
+    def test_returns_compact_text(self):
+        """Test that values are encoded as compact JSON text"""
+        result = json_dumps({"input": {"messages": ["hi"]}, "n": 1})
+
+        assert isinstance(result, str)
+        assert result == '{"input":{"messages":["hi"]},"n":1}'
+
+    def test_non_str_keys(self):
+        """Test that integer keys are stringified like the stdlib encoder"""
+        assert json.loads(json_dumps({1: "one"})) == {"1": "one"}
+
+    def test_big_int_falls_back(self):
+        """Test that integers too large for orjson still serialize compactly"""
+        assert json_dumps({"n": 2**70}) == f'{{"n":{2**70}}}'
+
+    def test_default_used_in_fallback(self):
+        """Test that the default hook also applies on the stdlib path"""
+        result = json_dumps({"n": 2**70, "s": {1}}, default=sorted)
+
+        assert json.loads(result) == {"n": 2**70, "s": [1]}
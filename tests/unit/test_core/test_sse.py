@@ -95,6 +95,18 @@ class TestFormatSSEMessage:
 
         assert "custom_date" in result
 
+    def test_format_message_with_non_str_keys(self):
+        """Test SSE message with integer dictionary keys"""
+        result = format_sse_message("test_event", {1: "one"})
+
+        assert 'data: {"1":"one"}' in result
+
+    def test_format_message_with_big_int(self):
+        """Test SSE message with an integer too large for orjson"""
+        result = format_sse_message("test_event", {"n": 2**70})
+
+        assert f'data: {{"n":{2**70}}}' in result
+
 
 class TestCreateMetadataEvent:
     """Test create_metadata_event function"""
@@ -387,3 +387,68 @@ async def test_middleware_handles_json_array():
     await middleware(scope, receive, send)
 
     assert app.called
+
+
+async def _received_body(scope: dict, messages: list[dict]) -> tuple[bytes, dict]:
+    """Run the middleware and return the body and scope the app saw"""
+    seen: dict = {}
+
+    async def app(scope, receive, _send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        seen["body"] = body
+        seen["scope"] = scope
+
+    queue = list(messages)
+
+    async def receive():
+        return queue.pop(0)
+
+    await DoubleEncodedJSONMiddleware(app)(scope, receive, AsyncMock())
+    return seen["body"], seen["scope"]
+
+
+@pytest.mark.asyncio
+async def test_middleware_leaves_plain_json_body_untouched():
+    """Test that well-formed JSON bodies reach the app byte-for-byte"""
+    body = b'{"limit": 10,   "offset": 0}'
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-type", b"application/json")],
+    }
+
+    received, _ = await _received_body(
+        scope, [{"type": "http.request", "body": body, "more_body": False}]
+    )
+
+    assert received == body
+
+
+@pytest.mark.asyncio
+async def test_middleware_unwraps_double_encoded_body():
+    """Test that a double-encoded body reaches the app as plain JSON"""
+    inner = {"limit": 10}
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-type", b"text/plain")],
+    }
+
+    received, seen_scope = await _received_body(
+        scope,
+        [
+            {
+                "type": "http.request",
+                "body": json.dumps(json.dumps(inner)).encode(),
+                "more_body": False,
+            }
+        ],
+    )
+
+    assert json.loads(received) == inner
+    assert (b"content-type", b"application/json") in seen_scope["headers"]
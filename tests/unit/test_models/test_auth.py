@@ -0,0 +1,25 @@
+"""Unit tests for authentication models"""
+
+import pytest
+from pydantic import ValidationError
+
+from agent_server.models.auth import User
+
+
+class TestUser:
+    """Test the immutable User model"""
+
+    def test_permissions_are_a_tuple(self):
+        """Test that list permissions are stored as an immutable tuple"""
+        user = User(identity="alice", permissions=["read", "write"])
+
+        assert user.permissions == ("read", "write")
+        assert User(identity="bob").permissions == ()
+
+    def test_user_is_frozen_and_hashable(self):
+        """Test that users cannot be mutated and can be used as cache keys"""
+        user = User(identity="alice", permissions=["read"])
+
+        with pytest.raises(ValidationError):
+            user.identity = "mallory"
+        assert hash(user) == hash(User(identity="alice", permissions=("read",)))
@@ -0,0 +1,98 @@
+"""Unit tests for per-user run admission control"""
+
+import asyncio
+
+import pytest
+
+from agent_server.services.admission import Admission, RunAdmission
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdmission:
+    """Test the Condition-based counting gate"""
+
+    @pytest.mark.asyncio
+    async def test_waiter_admitted_after_release(self):
+        gate = Admission(1)
+        await gate.acquire()
+
+        waiter = asyncio.create_task(gate.acquire())
+        await _settle()
+        assert not waiter.done()
+        assert gate.waiting == 1
+
+        await gate.release()
+        await asyncio.wait_for(waiter, timeout=1.0)
+        assert gate.active == 1
+        assert gate.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_take_slot(self):
+        gate = Admission(1)
+        await gate.acquire()
+
+        waiter = asyncio.create_task(gate.acquire())
+        await _settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert gate.active == 1
+        assert gate.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_notified_waiter_passes_slot_on(self):
+        gate = Admission(1)
+        await gate.acquire()
+
+        first = asyncio.create_task(gate.acquire())
+        second = asyncio.create_task(gate.acquire())
+        await _settle()
+
+        # The release wakes ``first``, which is cancelled before it runs
+        await gate.release()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        await asyncio.wait_for(second, timeout=1.0)
+        assert gate.active == 1
+        assert gate.waiting == 0
+
+
+class TestRunAdmission:
+    """Test the per-user admission controller"""
+
+    @pytest.mark.asyncio
+    async def test_limits_are_per_user(self):
+        admission = RunAdmission(1)
+        await admission.acquire("alice")
+
+        # Another user is not blocked by alice's run
+        await asyncio.wait_for(admission.acquire("bob"), timeout=1.0)
+
+        queued = asyncio.create_task(admission.acquire("alice"))
+        await _settle()
+        assert not queued.done()
+
+        await admission.release("alice")
+        await asyncio.wait_for(queued, timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_idle_gates_are_dropped(self):
+        admission = RunAdmission(2)
+        await admission.acquire("alice")
+        await admission.release("alice")
+
+        assert admission._gates == {}
+
+    @pytest.mark.asyncio
+    async def test_zero_limit_disables_admission(self):
+        admission = RunAdmission(0)
+
+        for _ in range(5):
+            await asyncio.wait_for(admission.acquire("alice"), timeout=1.0)
+
+        assert admission._gates == {}
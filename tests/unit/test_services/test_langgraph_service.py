@@ -369,6 +369,25 @@ class TestLangGraphServiceGraphs:
 
         assert result == {}
 
+    def test_list_graphs_cached_until_registry_reload(self):
+        """Test the graph listing is reused until graphs are re-registered"""
+        service = LangGraphService()
+        service.config = {"graphs": {"graph1": "./path1.py:graph"}}
+        service._load_graph_registry()
+
+        first = service.list_graphs()
+        assert service.list_graphs() is first
+        with pytest.raises(TypeError):
+            first["graph2"] = "./other.py"
+
+        service.config = {"graphs": {"graph2": "./path2.py:graph"}}
+        service._load_graph_registry()
+
+        assert service.list_graphs() == {
+            "graph1": "./path1.py",
+            "graph2": "./path2.py",
+        }
+
 
 class TestLangGraphServiceCache:
     """Test cache management"""
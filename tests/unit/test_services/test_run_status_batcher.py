@@ -0,0 +1,196 @@
+"""Unit tests for coalesced run status writes"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from agent_server.services.run_status_batcher import RunStatusBatcher
+
+
+class _Session:
+    def __init__(self, writes: list[list[dict]], fail: bool = False) -> None:
+        self._writes = writes
+        self._fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, _stmt, params):
+        if self._fail:
+            raise RuntimeError("db down")
+        self._writes.append(params)
+
+    async def commit(self):
+        pass
+
+
+def _batcher(writes: list[list[dict]], **kwargs) -> RunStatusBatcher:
+    fail = kwargs.pop("fail", False)
+    return RunStatusBatcher(session_maker=lambda: _Session(writes, fail), **kwargs)
+
+
+class TestRunStatusBatcher:
+    """Test batching and durability of run status updates"""
+
+    @pytest.mark.asyncio
+    async def test_without_flusher_writes_immediately(self):
+        writes: list[list[dict]] = []
+        batcher = _batcher(writes)
+
+        await batcher.submit("run-1", {"status": "running"})
+
+        assert writes == [[{"run_id": "run-1", "status": "running"}]]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_share_one_write(self):
+        writes: list[list[dict]] = []
+        batcher = _batcher(writes, interval=0.01)
+        await batcher.start()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    batcher.submit("run-1", {"status": "running"}),
+                    batcher.submit("run-2", {"status": "running"}),
+                    batcher.submit("run-1", {"status": "completed", "output": {}}),
+                ),
+                timeout=1.0,
+            )
+        finally:
+            await batcher.stop()
+
+        # One transaction; run starts use their own guarded statement
+        assert writes == [
+            [{"run_id": "run-2", "status": "running"}],
+            [{"run_id": "run-1", "status": "completed", "output": {}}],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_run_start_is_guarded_and_not_awaited(self):
+        writes: list[list[dict]] = []
+        session = _Session(writes)
+        session.execute = AsyncMock()
+        batcher = RunStatusBatcher(session_maker=lambda: session, interval=10)
+        await batcher.start()
+        try:
+            await asyncio.wait_for(
+                batcher.submit("run-1", {"status": "running"}, wait=False),
+                timeout=1.0,
+            )
+            session.execute.assert_not_awaited()
+        finally:
+            await batcher.stop()
+
+        # A late "running" must not overwrite a final status
+        stmt, params = session.execute.await_args.args
+        assert "status IN" in str(stmt)
+        assert params == [{"run_id": "run-1", "status": "running"}]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_submitter_withdraws_update(self):
+        writes: list[list[dict]] = []
+        batcher = _batcher(writes, interval=10)
+        await batcher.start()
+        try:
+            submit = asyncio.create_task(batcher.submit("run-1", {"status": "running"}))
+            await asyncio.sleep(0)
+            submit.cancel()
+            await asyncio.gather(submit, return_exceptions=True)
+
+            assert batcher._pending == {}
+        finally:
+            await batcher.stop()
+
+        assert writes == []
+
+    @pytest.mark.asyncio
+    async def test_discard_drops_queued_update(self):
+        writes: list[list[dict]] = []
+        batcher = _batcher(writes, interval=10)
+        await batcher.start()
+        try:
+            await batcher.submit("run-1", {"status": "running"}, wait=False)
+            batcher.discard("run-1")
+        finally:
+            await batcher.stop()
+
+        assert writes == []
+
+    @pytest.mark.asyncio
+    async def test_flush_skips_the_interval(self):
+        writes: list[list[dict]] = []
+        batcher = _batcher(writes, interval=10)
+        await batcher.start()
+        try:
+            await asyncio.wait_for(
+                batcher.submit("run-1", {"status": "failed"}, flush=True),
+                timeout=1.0,
+            )
+        finally:
+            await batcher.stop()
+
+        assert writes == [[{"run_id": "run-1", "status": "failed"}]]
+
+    @pytest.mark.asyncio
+    async def test_write_error_reaches_submitter(self):
+        batcher = _batcher([], fail=True)
+
+        with pytest.raises(RuntimeError, match="db down"):
+            await batcher.submit("run-1", {"status": "failed"})
+
+        assert batcher._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_large_batch_uses_raw_executemany(self):
+        driver = Mock(executemany=AsyncMock())
+        session = _Session([])
+        session.connection = AsyncMock(
+            return_value=Mock(
+                get_raw_connection=AsyncMock(
+                    return_value=Mock(driver_connection=driver)
+                )
+            )
+        )
+        batcher = RunStatusBatcher(session_maker=lambda: session, bulk_threshold=2)
+
+        batcher._pending = {
+            "run-1": {"status": "completed", "output": {"n": 1}},
+            "run-2": {"status": "failed", "output": {}, "error_message": "boom"},
+        }
+        await batcher.flush()
+
+        sql, args = driver.executemany.await_args.args
+        assert sql.startswith("UPDATE runs SET status = $1")
+        assert [(a[0], json.loads(a[1]), a[2], a[3]) for a in args] == [
+            ("completed", {"n": 1}, None, "run-1"),
+            ("failed", {}, "boom", "run-2"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_flush_resolves_waiter_of_discarded_update(self):
+        writes: list[list[dict]] = []
+        gate = asyncio.Event()
+
+        class _GatedSession(_Session):
+            async def execute(self, stmt, params):
+                await gate.wait()
+                await super().execute(stmt, params)
+
+        batcher = RunStatusBatcher(session_maker=lambda: _GatedSession(writes))
+        first = asyncio.create_task(batcher.submit("run-A", {"status": "failed"}))
+        await asyncio.sleep(0)
+        # Queued behind the in-flight flush, then withdrawn by a direct write
+        second = asyncio.create_task(
+            batcher.submit("run-B", {"status": "cancelled"}, flush=True)
+        )
+        await asyncio.sleep(0)
+        batcher.discard("run-B")
+        gate.set()
+
+        await asyncio.wait_for(asyncio.gather(first, second), timeout=1.0)
+
+        assert writes == [[{"run_id": "run-A", "status": "failed"}]]
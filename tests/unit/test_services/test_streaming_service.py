@@ -0,0 +1,94 @@
+"""Unit tests for StreamingService event storage"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from agent_server.services.broker import broker_manager
+from agent_server.services.streaming_service import StreamingService
+
+
+class TestStoreEventsFromRaw:
+    """Test batched conversion and storage of raw events"""
+
+    @pytest.mark.asyncio
+    async def test_batch_is_stored_in_one_call(self):
+        """Test that a batch of raw events is written with a single store call"""
+        service = StreamingService()
+        raw_events = [
+            ("run-1_event_1", ("values", {"count": 1})),
+            ("run-1_event_2", ("messages", ("chunk", {"tags": []}))),
+            ("run-1_event_3", {"count": 2}),
+        ]
+
+        with patch("agent_server.services.streaming_service.event_store") as mock_store:
+            mock_store.store_events = AsyncMock()
+            await service.store_events_from_raw("run-1", raw_events)
+
+        mock_store.store_events.assert_awaited_once()
+        run_id, events = mock_store.store_events.await_args.args
+        assert run_id == "run-1"
+        assert [e.id for e in events] == [
+            "run-1_event_1",
+            "run-1_event_2",
+            "run-1_event_3",
+        ]
+        assert [e.event for e in events] == ["values", "messages", "values"]
+
+    @pytest.mark.asyncio
+    async def test_skipped_updates_are_dropped(self):
+        """Test that non-interrupt updates are filtered out of the batch"""
+        service = StreamingService()
+        raw_events = [
+            ("run-1_event_1", ("updates", {"node": {"x": 1}})),
+            ("run-1_event_2", ("updates", {"__interrupt__": [{"value": "?"}]})),
+        ]
+
+        with patch("agent_server.services.streaming_service.event_store") as mock_store:
+            mock_store.store_events = AsyncMock()
+            await service.store_events_from_raw(
+                "run-1", raw_events, only_interrupt_updates=True
+            )
+
+        _, events = mock_store.store_events.await_args.args
+        assert [e.id for e in events] == ["run-1_event_2"]
+
+
+class TestDropBuffer:
+    """Test release of live buffers for finished runs"""
+
+    @pytest.mark.asyncio
+    async def test_drop_removes_broker_and_counter(self):
+        """Test that dropping forgets both the broker and the event counter"""
+        service = StreamingService()
+        await service.signal_run_cancelled("run-drop")
+        assert broker_manager.get_broker("run-drop") is not None
+
+        await service.drop_buffer("run-drop")
+
+        assert broker_manager.get_broker("run-drop") is None
+        assert "run-drop" not in service.event_counters
+
+    @pytest.mark.asyncio
+    async def test_scheduled_drop_waits_for_delay(self):
+        """Test that a scheduled drop keeps the buffer until the delay passes"""
+        service = StreamingService()
+        await service.signal_run_cancelled("run-late")
+
+        service.schedule_buffer_drop("run-late", delay=0.01)
+        assert broker_manager.get_broker("run-late") is not None
+
+        await asyncio.sleep(0.05)
+        assert broker_manager.get_broker("run-late") is None
+
+    @pytest.mark.asyncio
+    async def test_finished_run_does_not_recreate_broker(self):
+        """Test that streaming a dropped terminal run creates no new broker"""
+        service = StreamingService()
+        run = Mock(run_id="run-gone", status="interrupted")
+
+        events = [e async for e in service._stream_live_events(run, 0)]
+
+        assert events == []
+        assert broker_manager.get_broker("run-gone") is None